@@ -0,0 +1,195 @@
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from consumption import CONSUMPTION_MODES
+from environment import Environment
+from profiling import PhaseTimer
+from shading import LIGHT_MODES
+from simulation import parse_resource_scale, parse_size
+
+
+DEFAULT_PLANTS = (20, 200, 2000, 10000, 50000)
+DEFAULT_SIZES = ((700, 500), (2000, 2000), (4000, 4000), (8000, 8000))
+PHASES = ("weather", "shading", "resources", "growth", "remove_dead", "draw")
+
+
+def create_canvas(width, height):
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception:
+        return None, None
+
+    root.withdraw()
+    canvas = tk.Canvas(root, width=width, height=height)
+    return root, canvas
+
+
+def measure_memory(width, height, plants, seed, consumption, lean, chunk_size=None, light="dense", resource_scale=1,
+                   threads=None):
+    tracemalloc.start()
+    try:
+        environment = Environment(
+            width, height, plants, consumption=consumption, seed=seed, lean=lean, chunk_size=chunk_size,
+            light=light, resource_scale=resource_scale, threads=threads
+        )
+        environment.update_resources()
+        environment.remove_dead_plants()
+        environment.close()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_case(width, height, plants, ticks, seed, consumption="sequential", lean=False, draw=True, chunk_size=None,
+             light="dense", resource_scale=1, threads=None):
+    environment = Environment(
+        width, height, plants, consumption=consumption, seed=seed, lean=lean, chunk_size=chunk_size,
+        light=light, resource_scale=resource_scale, threads=threads
+    )
+    timer = PhaseTimer()
+
+    root, canvas = create_canvas(width, height) if draw else (None, None)
+    renderer = None
+    if canvas is not None:
+        from renderer import PlantRenderer
+        from viewport import Viewport
+        renderer = PlantRenderer(canvas, Viewport(width, height))
+
+    environment.update_resources()
+    environment.remove_dead_plants()
+    environment.set_phase_timer(timer)
+
+    started = time.perf_counter()
+    for _ in range(ticks):
+        environment.update_resources()
+        environment.remove_dead_plants()
+        if renderer is not None:
+            with timer.phase("draw"):
+                renderer.draw(environment.get_population())
+                root.update_idletasks()
+    elapsed = time.perf_counter() - started
+    environment.close()
+
+    if root is not None:
+        root.destroy()
+
+    totals = timer.get_totals()
+    return {
+        "width": width,
+        "height": height,
+        "plants": plants,
+        "alive": len(environment.get_population()),
+        "ticks": ticks,
+        "phases": {name: totals[name] / ticks if name in totals else None for name in PHASES},
+        "ticks_per_second": ticks / elapsed if elapsed > 0 else None,
+        "peak_memory_mb": measure_memory(
+            width, height, plants, seed, consumption, lean, chunk_size, light, resource_scale, threads
+        ) / 2 ** 20
+    }
+
+
+def run_suite(sizes, plant_counts, ticks, seed, consumption="sequential", lean=False, draw=True, log=None,
+              chunk_size=None, light="dense", resource_scale=1, threads=None):
+    results = []
+    for width, height in sizes:
+        for plants in plant_counts:
+            result = run_case(
+                width, height, plants, ticks, seed, consumption=consumption, lean=lean, draw=draw,
+                chunk_size=chunk_size, light=light, resource_scale=resource_scale, threads=threads
+            )
+            results.append(result)
+            if log is not None:
+                log(f"{width}x{height} {plants:>6} растений: {result['ticks_per_second']:.2f} тиков/с, "
+                    f"{result['peak_memory_mb']:.0f} МБ")
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "seed": seed,
+            "ticks": ticks,
+            "consumption": consumption,
+            "lean": lean,
+            "chunk_size": chunk_size,
+            "light": light,
+            "resource_scale": resource_scale,
+            "threads": threads
+        },
+        "results": results
+    }
+
+
+def find_regressions(report, baseline, tolerance):
+    reference = {(r["width"], r["height"], r["plants"]): r for r in baseline["results"]}
+    regressions = []
+    for result in report["results"]:
+        previous = reference.get((result["width"], result["height"], result["plants"]))
+        if previous is None:
+            continue
+        for name in PHASES:
+            current, before = result["phases"][name], previous["phases"].get(name)
+            if current is not None and before and current > before * (1 + tolerance):
+                regressions.append({
+                    "width": result["width"], "height": result["height"], "plants": result["plants"],
+                    "phase": name, "baseline": before, "current": current
+                })
+    return regressions
+
+
+def parse_list(parser):
+    return lambda value: [parser(item) for item in value.split(",")]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="benchmark", description="Замеры масштабирования Environment")
+    parser.add_argument("--plants", type=parse_list(int), default=list(DEFAULT_PLANTS))
+    parser.add_argument("--sizes", type=parse_list(parse_size), default=list(DEFAULT_SIZES))
+    parser.add_argument("--ticks", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--consumption", choices=CONSUMPTION_MODES, default="sequential")
+    parser.add_argument("--lean", action="store_true")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--light", choices=LIGHT_MODES, default="dense")
+    parser.add_argument("--resource-scale", type=parse_resource_scale, default=1)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--no-draw", action="store_true", help="Не замерять отрисовку на холсте")
+    parser.add_argument("--output", default=None, help="Файл для JSON-отчёта (по умолчанию stdout)")
+    parser.add_argument("--baseline", default=None, help="Предыдущий JSON-отчёт для поиска регрессий")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    report = run_suite(
+        args.sizes, args.plants, args.ticks, args.seed, consumption=args.consumption,
+        lean=args.lean, draw=not args.no_draw, log=lambda line: print(line, file=sys.stderr),
+        chunk_size=args.chunk_size, light=args.light, resource_scale=args.resource_scale,
+        threads=args.threads
+    )
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = find_regressions(report, json.load(f), args.tolerance)
+        report["regressions"] = regressions
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+import numpy as np
+from matplotlib.figure import Figure                                                                                    #type: ignore
+
+from plants import PLANT_TYPES, SPECIES_TYPES
+
+
+HEALTH_BINS = np.array([0, 20, 40, 60, 80, 100], dtype=np.float64)
+
+
+def population_aggregates(population):
+    species = population.get_column("species")
+    health = population.get_column("health")
+    codes = [PLANT_TYPES.index(plant_type) for plant_type in SPECIES_TYPES]
+
+    counts = np.bincount(species, minlength=len(PLANT_TYPES))
+    sums = np.bincount(species, weights=health, minlength=len(PLANT_TYPES))
+    species_counts = counts[codes]
+    species_health = np.divide(
+        sums[codes], species_counts, out=np.zeros(len(codes)), where=species_counts > 0
+    )
+    histogram, _ = np.histogram(health, bins=HEALTH_BINS)
+
+    return {
+        "total": len(health),
+        "species_counts": species_counts,
+        "species_health": species_health,
+        "health_histogram": histogram
+    }
+
+
+class StatsCharts:
+    def __init__(self):
+        names = [plant_type.SPECIES for plant_type in SPECIES_TYPES]
+        colors = [plant_type.COLOR for plant_type in SPECIES_TYPES]
+        positions = np.arange(len(names))
+
+        self.__species_figure = Figure(figsize=(6, 4))
+        ax = self.__species_figure.add_subplot()
+        self.__species_axes = ax
+        self.__species_bars = ax.bar(positions, np.zeros(len(names)), color=colors)
+        self.__species_labels = [
+            ax.annotate("", xy=(bar.get_x() + bar.get_width() / 2, 0), xytext=(0, 3),
+                        textcoords="offset points", ha='center', va='bottom')
+            for bar in self.__species_bars
+        ]
+        ax.set_xticks(positions, names, rotation=45, ha='right')
+        ax.set_title("Распределение типов растений")
+        ax.set_ylabel("Количество")
+        self.__species_empty = ax.text(
+            0.5, 0.5, "Нет растений для отображения", transform=ax.transAxes, ha='center', va='center'
+        )
+        self.__species_figure.subplots_adjust(bottom=0.2)
+
+        self.__health_figure = Figure(figsize=(10, 4))
+        self.__health_figure.suptitle("Здоровье растений")
+        ax1, ax2 = self.__health_figure.subplots(1, 2)
+        self.__histogram_axes = ax1
+        self.__histogram_bars = ax1.bar(
+            HEALTH_BINS[:-1], np.zeros(len(HEALTH_BINS) - 1), width=np.diff(HEALTH_BINS),
+            align='edge', color='#2E8B57', edgecolor='black'
+        )
+        ax1.set_xlim(HEALTH_BINS[0], HEALTH_BINS[-1])
+        ax1.set_title("Распределение здоровья")
+        ax1.set_xlabel("Уровень здоровья (%)")
+        ax1.set_ylabel("Количество")
+        ax1.grid(True, alpha=0.3)
+
+        self.__mean_health_bars = ax2.bar(positions, np.zeros(len(names)), color=colors)
+        self.__mean_health_labels = [
+            ax2.annotate("", xy=(bar.get_x() + bar.get_width() / 2, 0), xytext=(0, 3),
+                         textcoords="offset points", ha='center', va='bottom')
+            for bar in self.__mean_health_bars
+        ]
+        ax2.set_xticks(positions, names, rotation=45, ha='right')
+        ax2.set_title("Среднее здоровье по типам")
+        ax2.set_ylabel("Среднее здоровье (%)")
+        ax2.set_ylim(0, 100)
+        self.__health_empty = self.__health_figure.text(
+            0.5, 0.5, "Нет растений для отображения", ha='center', va='center'
+        )
+        self.__health_figure.tight_layout(pad=2.0)
+
+    def get_species_figure(self):
+        return self.__species_figure
+
+    def get_health_figure(self):
+        return self.__health_figure
+
+    def update(self, population):
+        aggregates = population_aggregates(population)
+        empty = aggregates["total"] == 0
+        self.__species_empty.set_visible(empty)
+        self.__health_empty.set_visible(empty)
+
+        counts = aggregates["species_counts"].tolist()
+        for bar, label, count in zip(self.__species_bars, self.__species_labels, counts):
+            bar.set_height(count)
+            label.xy = (label.xy[0], count)
+            label.set_text("" if empty else f"{count}")
+        self.__species_axes.set_ylim(0, max(max(counts), 1) * 1.15)
+
+        histogram = aggregates["health_histogram"].tolist()
+        for bar, count in zip(self.__histogram_bars, histogram):
+            bar.set_height(count)
+        self.__histogram_axes.set_ylim(0, max(max(histogram), 1) * 1.05)
+
+        for bar, label, count, health in zip(
+                self.__mean_health_bars, self.__mean_health_labels,
+                counts, aggregates["species_health"].tolist()):
+            bar.set_height(health)
+            label.xy = (label.xy[0], health)
+            label.set_text(f"{health:.1f}" if count else "")
+
+        return aggregates
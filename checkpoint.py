@@ -0,0 +1,67 @@
+import json
+import os
+import zipfile
+
+import numpy as np
+
+from environment import Environment
+from tiles import ChunkStack
+
+
+CHECKPOINT_VERSION = 1
+
+
+def save_checkpoint(environment, path):
+    meta, arrays = environment.get_state()
+    header = json.dumps(dict(meta, version=CHECKPOINT_VERSION)).encode("utf-8")
+
+    temporary_path = f"{path}.tmp"
+    with zipfile.ZipFile(temporary_path, "w", allowZip64=True) as archive:
+        write_entry(archive, "header", np.frombuffer(header, dtype=np.uint8))
+        for name, values in arrays.items():
+            write_entry(archive, name, values)
+    os.replace(temporary_path, path)
+
+
+def write_entry(archive, name, values):
+    with archive.open(f"{name}.npy", "w", force_zip64=True) as f:
+        if not isinstance(values, ChunkStack):
+            np.lib.format.write_array(f, np.asanyarray(values), allow_pickle=False)
+            return
+
+        np.lib.format.write_array_header_2_0(f, {
+            "descr": np.lib.format.dtype_to_descr(values.get_dtype()),
+            "fortran_order": False,
+            "shape": values.get_shape()
+        })
+        for chunk in values:
+            f.write(np.ascontiguousarray(chunk, dtype=values.get_dtype()).tobytes())
+
+
+def read_chunks(archive, name):
+    with archive.open(f"{name}.npy") as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, _, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, _, dtype = np.lib.format.read_array_header_2_0(f)
+        size = int(np.prod(shape[1:])) * dtype.itemsize
+        for _ in range(shape[0]):
+            yield np.frombuffer(f.read(size), dtype=dtype).reshape(shape[1:])
+
+
+def read_checkpoint_header(path):
+    with np.load(path) as data:
+        return json.loads(data["header"].tobytes().decode("utf-8"))
+
+
+def load_checkpoint(path, chunk_dir=None, threads=None):
+    with np.load(path) as data:
+        meta = json.loads(data["header"].tobytes().decode("utf-8"))
+        if meta.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"Неподдерживаемая версия контрольной точки: {meta.get('version')}")
+        arrays = {
+            name: read_chunks(data.zip, name) if name.endswith("_chunks") else data[name]
+            for name in data.files if name != "header"
+        }
+        return Environment.from_state(meta, arrays, chunk_dir=chunk_dir, threads=threads)
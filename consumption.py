@@ -0,0 +1,69 @@
+import numpy as np
+
+from sampling import coarse_cell_areas
+from tiles import chunk_spans
+
+
+CONSUMPTION_MODES = ("sequential", "batched")
+
+
+class DemandMap:
+    def __init__(self, width, height, pool=None):
+        self.__pool = pool
+        self.__width = width
+        self.__height = height
+        self.__demand = np.zeros((width + 1, height + 1))
+        self.__factor = np.empty((width, height))
+
+    def get_demand(self):
+        return self.__demand[:self.__width, :self.__height]
+
+    def accumulate(self, boxes, consumption_factors, plant_ids):
+        order = np.argsort(plant_ids, kind="stable")
+        x_min, x_max, y_min, y_max = (bound[order] for bound in boxes)
+        log_retention = np.log1p(-consumption_factors[order])
+
+        demand = self.__demand
+        demand.fill(0)
+        np.add.at(demand, (x_min, y_min), log_retention)
+        np.add.at(demand, (x_max, y_min), -log_retention)
+        np.add.at(demand, (x_min, y_max), -log_retention)
+        np.add.at(demand, (x_max, y_max), log_retention)
+
+        if self.__pool is None:
+            np.cumsum(demand, axis=0, out=demand)
+            np.cumsum(demand, axis=1, out=demand)
+            np.exp(self.get_demand(), out=self.__factor)
+            return
+
+        self.__pool.cumsum2d(demand, demand)
+        self.__pool.for_bands(
+            lambda start, stop: np.exp(demand[start:stop, :self.__height], out=self.__factor[start:stop]),
+            self.__width
+        )
+
+    def deplete(self, resource_map):
+        if self.__pool is not None:
+            self.__pool.multiply(resource_map, self.__factor)
+        else:
+            resource_map *= self.__factor
+
+
+class CoarseDemand:
+    def __init__(self, width, height, scale):
+        self.__scale = scale
+        self.__areas = coarse_cell_areas(width, height, scale)
+        self.__cells = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+        self.__retention = np.empty(0)
+
+    def accumulate(self, boxes, consumption_factors, plant_ids):
+        order = np.argsort(plant_ids, kind="stable")
+        rows, cell_x, cell_y, (x_min, x_max, y_min, y_max) = chunk_spans(
+            tuple(bound[order] for bound in boxes), self.__scale
+        )
+        overlap = (x_max - x_min) * (y_max - y_min) / self.__areas[cell_x, cell_y]
+        self.__cells = (cell_x, cell_y)
+        self.__retention = 1 - consumption_factors[order][rows] * overlap
+
+    def deplete(self, resource_map):
+        np.multiply.at(resource_map, self.__cells, self.__retention.astype(resource_map.dtype, copy=False))
@@ -0,0 +1,182 @@
+import argparse
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from consumption import CONSUMPTION_MODES
+from plants import PLANT_TYPES, SPECIES_TYPES
+from simulation import Simulation, parse_size
+
+
+SWEEP_PARAMETERS = {
+    "rain_probability": float,
+    "plants": int,
+    "species_weights": lambda value: [float(weight) for weight in value.split(":")]
+}
+
+
+def default_config():
+    return {
+        "width": 700,
+        "height": 500,
+        "plants": 20,
+        "ticks": 1000,
+        "seed": None,
+        "consumption": "sequential",
+        "rain_probability": 0.15,
+        "species_weights": None,
+        "lean": False
+    }
+
+
+def run_replicate(config):
+    simulation = Simulation(
+        config["width"], config["height"], config["plants"],
+        consumption=config["consumption"], seed=config["seed"],
+        rain_probability=config["rain_probability"], species_weights=config["species_weights"],
+        lean=config["lean"]
+    )
+    environment = simulation.get_environment()
+    population = environment.get_population()
+    species_codes = [PLANT_TYPES.index(plant_type) for plant_type in SPECIES_TYPES]
+
+    ticks = config["ticks"]
+    alive = np.zeros((ticks, len(SPECIES_TYPES)), dtype=np.int32)
+    mean_health = np.zeros(ticks)
+    deaths = np.zeros(ticks, dtype=np.int32)
+
+    for tick in range(ticks):
+        dead_before = environment.get_dead_plants_count()
+        simulation.step()
+
+        species_count = np.bincount(population.get_column("species"), minlength=len(PLANT_TYPES))
+        alive[tick] = species_count[species_codes]
+        health = population.get_column("health")
+        mean_health[tick] = health.mean() if len(health) else 0.0
+        deaths[tick] = environment.get_dead_plants_count() - dead_before
+
+    return {"config": config, "alive": alive, "mean_health": mean_health, "deaths": deaths}
+
+
+def replicate_configs(base_config, replicates, base_seed=None):
+    seeds = np.random.SeedSequence(base_seed).generate_state(replicates)
+    return [dict(base_config, seed=int(seed)) for seed in seeds]
+
+
+def sweep_configs(base_config, parameter, values, replicates, base_seed=None):
+    if parameter not in SWEEP_PARAMETERS:
+        raise ValueError(f"Параметр нельзя перебирать: {parameter}")
+
+    return [
+        replicate_configs(dict(base_config, **{parameter: value}), replicates, base_seed)
+        for value in values
+    ]
+
+
+def run_ensemble(configs, max_workers=None):
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(run_replicate, configs))
+
+
+def confidence_band(samples, z=1.96):
+    samples = np.asarray(samples, dtype=float)
+    mean = samples.mean(axis=0)
+    if len(samples) > 1:
+        margin = z * samples.std(axis=0, ddof=1) / np.sqrt(len(samples))
+    else:
+        margin = np.zeros_like(mean)
+    return {"mean": mean, "lower": mean - margin, "upper": mean + margin}
+
+
+def summarize(results):
+    alive = np.stack([result["alive"] for result in results])
+    return {
+        "replicates": len(results),
+        "alive": {
+            plant_type.SPECIES: confidence_band(alive[:, :, i])
+            for i, plant_type in enumerate(SPECIES_TYPES)
+        },
+        "mean_health": confidence_band([result["mean_health"] for result in results]),
+        "deaths": confidence_band([result["deaths"] for result in results])
+    }
+
+
+def to_json(value):
+    if isinstance(value, dict):
+        return {key: to_json(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_json(item) for item in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return value
+
+
+def parse_sweep(value):
+    parameter, _, values = value.partition("=")
+    if parameter not in SWEEP_PARAMETERS or not values:
+        raise argparse.ArgumentTypeError(
+            f"Ожидается ПАРАМЕТР=ЗНАЧЕНИЕ,... где параметр из {', '.join(SWEEP_PARAMETERS)}: {value}"
+        )
+    return parameter, [SWEEP_PARAMETERS[parameter](item) for item in values.split(",")]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="ensemble", description="Серия повторных прогонов на всех ядрах")
+    parser.add_argument("--replicates", type=int, default=10)
+    parser.add_argument("--ticks", type=int, default=1000)
+    parser.add_argument("--plants", type=int, default=20)
+    parser.add_argument("--size", type=parse_size, default=(700, 500))
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--consumption", choices=CONSUMPTION_MODES, default="sequential")
+    parser.add_argument("--rain-probability", type=float, default=0.15)
+    parser.add_argument("--lean", action="store_true")
+    parser.add_argument("--sweep", type=parse_sweep, default=None,
+                        help="Перебор параметра, например rain_probability=0.05,0.15,0.3")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", default=None, help="Файл для JSON-результатов (по умолчанию stdout)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    width, height = args.size
+    base_config = dict(
+        default_config(), width=width, height=height, plants=args.plants, ticks=args.ticks,
+        consumption=args.consumption, rain_probability=args.rain_probability, lean=args.lean
+    )
+    if args.sweep is None:
+        groups = [(None, None, replicate_configs(base_config, args.replicates, args.seed))]
+    else:
+        parameter, values = args.sweep
+        groups = [
+            (parameter, value, configs)
+            for value, configs in zip(values, sweep_configs(base_config, parameter, values, args.replicates, args.seed))
+        ]
+
+    configs = [config for _, _, group in groups for config in group]
+    results = run_ensemble(configs, max_workers=args.workers)
+
+    report = []
+    start = 0
+    for parameter, value, group in groups:
+        report.append({
+            "parameter": parameter,
+            "value": value,
+            "summary": summarize(results[start:start + len(group)])
+        })
+        start += len(group)
+
+    output = json.dumps(to_json(report), ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,543 @@
+import os
+
+import numpy as np
+
+from consumption import CONSUMPTION_MODES, CoarseDemand, DemandMap
+from parallel import TilePool
+from profiling import NULL_TIMER
+from plants import PLANT_TYPES, SPECIES_TYPES, PlantPopulation
+from sampling import CoarseResourceSampler, ResourceSampler, coarse_shape, footprint_boxes
+from shading import LIGHT_MODES, ShadingEngine
+from spatial import SpatialGrid
+from tiles import ChunkedGrid, chunk_spans, group_by_chunk
+
+
+RAIN_DURATION_TICKS = 10
+RESOURCE_LAYERS = ("water", "nutrients")
+MAP_LAYERS = ("light", "water", "nutrients", "shade")
+
+
+class Environment:
+    def __init__(self, width, height, num_plants, consumption="sequential", seed=None,
+                 rain_probability=0.15, species_weights=None, lean=False, chunk_size=None, chunk_dir=None,
+                 light="dense", resource_scale=1, threads=None, bounded=True):
+        if consumption not in CONSUMPTION_MODES:
+            raise ValueError(f"Неизвестный режим потребления: {consumption}")
+        if light not in LIGHT_MODES:
+            raise ValueError(f"Неизвестный режим освещения: {light}")
+        if light == "sparse" and chunk_size is not None:
+            raise ValueError("Разреженный свет не сочетается с чанками: чанки уже считают свет только под растениями")
+        if not isinstance(resource_scale, dict):
+            resource_scale = {name: resource_scale for name in RESOURCE_LAYERS}
+        for name in resource_scale.keys() - set(RESOURCE_LAYERS):
+            raise ValueError(f"Неизвестный слой ресурсов: {name}")
+        resource_scale = {name: resource_scale.get(name, 1) for name in RESOURCE_LAYERS}
+        for scale in resource_scale.values():
+            if not isinstance(scale, (int, np.integer)) or scale < 1:
+                raise ValueError(f"Масштаб карты ресурсов должен быть целым числом не меньше 1: {scale}")
+        resource_scale = {name: int(scale) for name, scale in resource_scale.items()}
+        if chunk_size is not None and max(resource_scale.values()) > 1:
+            raise ValueError("Грубые карты ресурсов не сочетаются с чанками")
+        if threads is not None and threads < 1:
+            raise ValueError(f"Число потоков должно быть положительным: {threads}")
+        if threads is not None and chunk_size is not None:
+            raise ValueError("Параллельные тайлы не сочетаются с чанками")
+
+        if seed is None:
+            seed = np.random.SeedSequence().entropy
+
+        self.__seed = seed
+        self.__rng = np.random.default_rng(seed)
+        self.__width = width
+        self.__height = height
+        self.__tick = 0
+        self.__population = PlantPopulation(max(num_plants, 1))
+        self.__dead_plants_count = 0
+        self.__lean = lean
+        self.__bounded = bounded
+        self.__chunk_size = chunk_size
+        self.__light = light
+        self.__resource_scale = resource_scale
+        self.__pool = TilePool(threads) if threads is not None else None
+        self.__daylight = 100
+        dtype = np.float32 if lean else np.float64
+        if chunk_size is not None:
+            if chunk_dir is not None:
+                os.makedirs(chunk_dir, exist_ok=True)
+            self.__resource_map = {
+                name: ChunkedGrid(
+                    width, height, chunk_size, fill=150.0, dtype=dtype,
+                    path=os.path.join(chunk_dir, f"{name}.bin") if chunk_dir is not None else None
+                )
+                for name in RESOURCE_LAYERS
+            }
+            self.__light_map = ChunkedGrid(width, height, chunk_size, fill=100.0, dtype=dtype)
+            self.__shade_map = None
+            self.__shading = ShadingEngine(chunk_size, chunk_size, dtype=dtype)
+            self.__sampler = ResourceSampler(chunk_size, chunk_size)
+            self.__demand = DemandMap(chunk_size, chunk_size) if consumption == "batched" else None
+        else:
+            self.__resource_map = {
+                name: np.full(coarse_shape(width, height, resource_scale[name]), 150.0, dtype=dtype)
+                for name in RESOURCE_LAYERS
+            }
+            if light == "sparse":
+                self.__light_map = None
+                self.__shade_map = None
+            elif lean:
+                self.__light_map = None
+                self.__shade_map = np.ones((width, height), dtype=dtype)
+            else:
+                self.__light_map = np.ones((width, height)) * 100.0
+                self.__shade_map = None
+            self.__shading = ShadingEngine(width, height, dtype=dtype, pool=self.__pool)
+            self.__sampler = ResourceSampler(width, height, pool=self.__pool)
+            fine = min(resource_scale.values()) == 1
+            self.__demand = DemandMap(width, height, pool=self.__pool) if consumption == "batched" and fine else None
+        self.__resource_samplers = {
+            name: CoarseResourceSampler(width, height, scale) if scale > 1 else self.__sampler
+            for name, scale in resource_scale.items()
+        }
+        self.__coarse_demand = {
+            name: CoarseDemand(width, height, scale) for name, scale in resource_scale.items() if scale > 1
+        }
+        self.__spatial = SpatialGrid(width, height)
+        self.__timer = NULL_TIMER
+        self.__consumption = consumption
+        self.__day_night_cycle = 0
+        self.__rain_probability = rain_probability
+        self.__raining = False
+        self.__rain_end_tick = 0
+
+        min_margin = 50
+
+        type_codes = np.array([PLANT_TYPES.index(t) for t in SPECIES_TYPES])
+        if species_weights is None:
+            choices = self.__rng.integers(0, len(SPECIES_TYPES), num_plants)
+        else:
+            weights = np.asarray(species_weights, dtype=float)
+            choices = self.__rng.choice(len(SPECIES_TYPES), num_plants, p=weights / weights.sum())
+        species = type_codes[choices]
+        xs = self.__rng.integers(min_margin, width - min_margin, num_plants, endpoint=True)
+        ys = self.__rng.integers(min_margin, height - min_margin, num_plants, endpoint=True)
+        radii = self.__rng.uniform(5, 15, num_plants)
+        heights = self.__rng.uniform(1, 5, num_plants)
+        self.__population.extend(species, np.arange(num_plants), xs, ys, radii, heights)
+
+    @classmethod
+    def from_state(cls, meta, arrays, chunk_dir=None, threads=None):
+        environment = cls(
+            meta["width"], meta["height"], 0, consumption=meta["consumption"], seed=meta["seed"],
+            rain_probability=meta["rain_probability"], lean=meta["lean"],
+            chunk_size=meta.get("chunk_size"), chunk_dir=chunk_dir, light=meta.get("light", "dense"),
+            resource_scale=meta.get("resource_scale", 1), threads=threads, bounded=meta.get("bounded", False)
+        )
+        environment.__load_state(meta, arrays)
+        return environment
+
+    def get_state(self):
+        meta = {
+            "width": self.__width,
+            "height": self.__height,
+            "seed": self.__seed,
+            "consumption": self.__consumption,
+            "lean": self.__lean,
+            "bounded": self.__bounded,
+            "chunk_size": self.__chunk_size,
+            "light": self.__light,
+            "resource_scale": self.__resource_scale,
+            "tick": self.__tick,
+            "day_night_cycle": self.__day_night_cycle,
+            "daylight": self.__daylight,
+            "rain_probability": self.__rain_probability,
+            "raining": self.__raining,
+            "rain_end_tick": self.__rain_end_tick,
+            "dead_plants_count": self.__dead_plants_count,
+            "rng_state": self.__rng.bit_generator.state
+        }
+        if self.__chunk_size is not None:
+            arrays = {}
+            for name, grid in self.__grids().items():
+                for part, values in grid.get_state().items():
+                    arrays[f"{name}_{part}"] = values
+        else:
+            arrays = {
+                "water": self.__resource_map["water"],
+                "nutrients": self.__resource_map["nutrients"]
+            }
+            if self.__light == "dense":
+                arrays["light"] = self.__shade_map if self.__lean else self.__light_map
+            else:
+                for part, values in self.__shading.get_state().items():
+                    arrays[f"shading_{part}"] = values
+        for name, column in self.__population.get_columns().items():
+            arrays[f"plant_{name}"] = column
+        return meta, arrays
+
+    def __load_state(self, meta, arrays):
+        self.__tick = meta["tick"]
+        self.__day_night_cycle = meta["day_night_cycle"]
+        self.__daylight = meta["daylight"]
+        self.__raining = meta["raining"]
+        self.__rain_end_tick = meta["rain_end_tick"]
+        self.__dead_plants_count = meta["dead_plants_count"]
+        self.__rng.bit_generator.state = meta["rng_state"]
+
+        if self.__chunk_size is not None:
+            for name, grid in self.__grids().items():
+                prefix = f"{name}_"
+                grid.load_state({key[len(prefix):]: values for key, values in arrays.items() if key.startswith(prefix)})
+        else:
+            np.copyto(self.__resource_map["water"], arrays["water"])
+            np.copyto(self.__resource_map["nutrients"], arrays["nutrients"])
+            if self.__light == "dense":
+                np.copyto(self.__shade_map if self.__lean else self.__light_map, arrays["light"])
+        self.__population.load_columns({
+            name[len("plant_"):]: column for name, column in arrays.items() if name.startswith("plant_")
+        })
+        if self.__light == "sparse":
+            if "shading_windows" in arrays:
+                self.__shading.load_state({
+                    name[len("shading_"):]: values for name, values in arrays.items() if name.startswith("shading_")
+                })
+            else:
+                self.__calculate_shading()
+
+    def get_plants(self):
+        return self.__population.get_plants()
+
+    def get_population(self):
+        return self.__population
+
+    def get_phase_timer(self):
+        return self.__timer
+
+    def set_phase_timer(self, timer):
+        self.__timer = timer if timer is not None else NULL_TIMER
+
+    def get_spatial_index(self):
+        self.__spatial.refresh(self.__population)
+        return self.__spatial
+
+    def get_width(self):
+        return self.__width
+
+    def get_height(self):
+        return self.__height
+
+    def is_lean(self):
+        return self.__lean
+
+    def is_bounded(self):
+        return self.__bounded
+
+    def is_tiled(self):
+        return self.__chunk_size is not None
+
+    def get_chunk_size(self):
+        return self.__chunk_size
+
+    def get_light_mode(self):
+        return self.__light
+
+    def get_resource_scale(self, name):
+        return self.__resource_scale[name]
+
+    def get_daylight(self):
+        return self.__daylight
+
+    def get_layer(self, name):
+        if name not in MAP_LAYERS:
+            raise ValueError(f"Неизвестный слой карты: {name}")
+        if name == "light":
+            return self.get_light_map(), 1
+        if name == "shade":
+            if self.__shade_map is not None:
+                return self.__shade_map, 1
+            return self.get_light_map() / self.__daylight, 1
+        return self.get_resource_map(name), self.__resource_scale[name]
+
+    def __grids(self):
+        return {"water": self.__resource_map["water"], "nutrients": self.__resource_map["nutrients"],
+                "light": self.__light_map}
+
+    def get_grid(self, name):
+        if self.__chunk_size is None:
+            raise ValueError("Чанки доступны только в режиме с разбиением на чанки")
+        return self.__grids()[name]
+
+    def flush(self):
+        if self.__chunk_size is not None:
+            for grid in self.__grids().values():
+                grid.flush()
+
+    def get_threads(self):
+        return self.__pool.get_threads() if self.__pool is not None else None
+
+    def close(self):
+        self.flush()
+        if self.__pool is not None:
+            self.__pool.close()
+
+    def get_light_map(self):
+        if self.__chunk_size is not None:
+            return self.__light_map.to_dense()
+        if self.__light == "sparse":
+            light_map = np.full((self.__width, self.__height), float(self.__daylight))
+            self.__shading.apply(light_map)
+            return light_map
+        if self.__lean:
+            return self.__shade_map * self.__daylight
+        return self.__light_map
+
+    def get_resource_map(self, name):
+        if self.__chunk_size is not None:
+            return self.__resource_map[name].to_dense()
+        return self.__resource_map[name]
+
+    def get_mean_resources(self):
+        if self.__chunk_size is not None:
+            return {name: grid.mean() for name, grid in self.__grids().items()}
+        if self.__light == "sparse":
+            cells = self.__width * self.__height
+            tall, low = self.__shading.get_shade_counts()
+            light = float(self.__daylight * (cells - 0.3 * tall - 0.1 * low) / cells)
+        elif self.__lean:
+            light = float(self.__shade_map.mean(dtype=np.float64)) * self.__daylight
+        else:
+            light = float(self.__light_map.mean())
+        resources = {"light": light}
+        for name in RESOURCE_LAYERS:
+            if self.__resource_scale[name] > 1:
+                resources[name] = self.__resource_samplers[name].mean(self.__resource_map[name])
+            else:
+                resources[name] = float(self.__resource_map[name].mean(dtype=np.float64))
+        return resources
+
+    def get_seed(self):
+        return self.__seed
+
+    def get_rng(self):
+        return self.__rng
+
+    def get_tick(self):
+        return self.__tick
+
+    def get_day_night_cycle(self):
+        return self.__day_night_cycle
+
+    def is_raining(self):
+        return self.__raining
+
+    def get_dead_plants_count(self):
+        return self.__dead_plants_count
+
+    def get_rain_probability(self):
+        return self.__rain_probability
+
+    def get_consumption_mode(self):
+        return self.__consumption
+
+    def update_resources(self):
+        timer = self.__timer
+
+        with timer.phase("weather"):
+            self.__tick += 1
+            self.__day_night_cycle = (self.__day_night_cycle + 1) % 24
+            self.__daylight = 100 if 6 <= self.__day_night_cycle <= 20 else 10
+            if self.__chunk_size is not None:
+                self.__light_map.set_all(self.__daylight)
+            elif self.__light == "dense" and not self.__lean:
+                self.__fill(self.__light_map, self.__daylight)
+
+            water = self.__resource_map["water"]
+            nutrients = self.__resource_map["nutrients"]
+
+            if self.__rng.random() < self.__rain_probability and not self.__raining:
+                self.__raining = True
+                self.__rain_end_tick = self.__tick + RAIN_DURATION_TICKS
+                rain_amount = self.__rng.uniform(20, 40)
+                self.__add_clipped(water, rain_amount)
+
+            if self.__raining and self.__tick >= self.__rain_end_tick:
+                self.__raining = False
+
+            self.__add_clipped(water, -0.5)
+            self.__add_clipped(nutrients, 0.8)
+
+        population = self.__population
+        if self.__chunk_size is not None:
+            light, water, nutrients = self.__update_chunks()
+        else:
+            with timer.phase("shading"):
+                self.__calculate_shading()
+
+            with timer.phase("resources"):
+                boxes = footprint_boxes(
+                    population.get_column("x"),
+                    population.get_column("y"),
+                    population.get_column("radius"),
+                    self.__width,
+                    self.__height
+                )
+                light, water, nutrients = self.__get_plant_resources(boxes)
+
+        with timer.phase("growth"):
+            population.grow_all(light, water, nutrients)
+            if self.__bounded:
+                population.clamp_to(self.__width, self.__height)
+
+    def __add_clipped(self, values, amount):
+        if self.__chunk_size is not None:
+            values.add_clip(amount, 0, 200)
+        elif self.__pool is not None:
+            self.__pool.add_clip(values, amount, 0, 200)
+        else:
+            values += amount
+            np.clip(values, 0, 200, out=values)
+
+    def __update_chunks(self):
+        population = self.__population
+        xs = population.get_column("x")
+        ys = population.get_column("y")
+        radii = population.get_column("radius")
+        size = self.__chunk_size
+        columns = self.__light_map.get_shape()[1]
+
+        with self.__timer.phase("shading"):
+            rows, chunk_x, chunk_y, _ = chunk_spans(
+                footprint_boxes(xs, ys, radii + 1, self.__width, self.__height), size
+            )
+            order, active_x, active_y, starts, stops = group_by_chunk(chunk_x, chunk_y, columns)
+            rows = rows[order]
+            for i, j, start, stop in zip(active_x, active_y, starts, stops):
+                members = rows[start:stop]
+                self.__shading.render(
+                    xs[members] - i * size, ys[members] - j * size,
+                    radii[members], population.get_column("height")[members]
+                )
+                self.__shading.apply(self.__light_map.chunk(i, j))
+
+        with self.__timer.phase("resources"):
+            boxes = footprint_boxes(xs, ys, radii, self.__width, self.__height)
+            rows, chunk_x, chunk_y, local = chunk_spans(boxes, size)
+            order, active_x, active_y, starts, stops = group_by_chunk(chunk_x, chunk_y, columns)
+            rows = rows[order]
+            local = tuple(bound[order] for bound in local)
+
+            consumption_factors = population.get_column("aggressiveness")[rows] * 0.03
+            ids = population.get_column("id")[rows]
+            grids = (self.__light_map, self.__resource_map["water"], self.__resource_map["nutrients"])
+            sums = np.zeros((len(grids), len(rows)))
+            for i, j, start, stop in zip(active_x, active_y, starts, stops):
+                chunk_boxes = tuple(bound[start:stop] for bound in local)
+                x_min, x_max, y_min, y_max = chunk_boxes
+                x0, x1, y0, y1 = int(x_min.min()), int(x_max.max()), int(y_min.min()), int(y_max.max())
+                window_boxes = (x_min - x0, x_max - x0, y_min - y0, y_max - y0)
+                light, water, nutrients = (grid.chunk(i, j) for grid in grids)
+                for k, values in enumerate((light, water, nutrients)):
+                    sums[k, start:stop] = self.__sampler.sum(values[x0:x1, y0:y1], window_boxes)
+                self.__consume_chunk(water, nutrients, chunk_boxes, consumption_factors[start:stop], ids[start:stop])
+
+            x_min, x_max, y_min, y_max = boxes
+            areas = np.maximum(x_max - x_min, 0) * np.maximum(y_max - y_min, 0)
+            means = []
+            for k in range(len(grids)):
+                totals = np.bincount(rows, weights=sums[k], minlength=len(population))
+                mean = np.zeros(len(population))
+                np.divide(totals, areas, out=mean, where=areas > 0)
+                means.append(mean)
+        return tuple(means)
+
+    def __consume_chunk(self, water, nutrients, boxes, consumption_factors, ids):
+        if self.__consumption == "batched":
+            self.__demand.accumulate(boxes, consumption_factors, ids)
+            self.__demand.deplete(water)
+            self.__demand.deplete(nutrients)
+            return
+
+        for x_min, x_max, y_min, y_max, consumption_factor in zip(
+                *(bound.tolist() for bound in boxes), consumption_factors.tolist()):
+            water[x_min:x_max, y_min:y_max] *= (1 - consumption_factor)
+            nutrients[x_min:x_max, y_min:y_max] *= (1 - consumption_factor)
+
+    def __fill(self, values, value):
+        if self.__pool is not None:
+            self.__pool.fill(values, value)
+        else:
+            values.fill(value)
+
+    def __calculate_shading(self):
+        population = self.__population
+        columns = (
+            population.get_column("x"),
+            population.get_column("y"),
+            population.get_column("radius"),
+            population.get_column("height")
+        )
+        if self.__light == "sparse":
+            self.__shading.render_sparse(*columns)
+            return
+
+        self.__shading.render(*columns)
+        if self.__lean:
+            self.__fill(self.__shade_map, 1)
+            self.__shading.apply(self.__shade_map)
+        else:
+            self.__shading.apply(self.__light_map)
+
+    def __get_plant_resources(self, boxes):
+        if self.__light == "sparse":
+            avg_light = self.__shading.sample_light(boxes, self.__daylight)
+        else:
+            avg_light = self.__sampler.sample(self.__shade_map if self.__lean else self.__light_map, boxes)
+            if self.__lean:
+                avg_light *= self.__daylight
+        avg_water, avg_nutrients = (
+            self.__resource_samplers[name].sample(self.__resource_map[name], boxes) for name in RESOURCE_LAYERS
+        )
+
+        consumption_factors = self.__population.get_column("aggressiveness") * 0.03
+        ids = self.__population.get_column("id")
+        for name, demand in self.__coarse_demand.items():
+            demand.accumulate(boxes, consumption_factors, ids)
+            demand.deplete(self.__resource_map[name])
+
+        fine_maps = [self.__resource_map[name] for name in RESOURCE_LAYERS if name not in self.__coarse_demand]
+        if not fine_maps:
+            return avg_light, avg_water, avg_nutrients
+
+        if self.__consumption == "batched":
+            self.__demand.accumulate(boxes, consumption_factors, ids)
+            for resource_map in fine_maps:
+                self.__demand.deplete(resource_map)
+            return avg_light, avg_water, avg_nutrients
+
+        if self.__pool is not None:
+            self.__pool.for_bands(
+                lambda start, stop: self.__consume(fine_maps, boxes, consumption_factors, start, stop), self.__width
+            )
+        else:
+            self.__consume(fine_maps, boxes, consumption_factors, 0, self.__width)
+
+        return avg_light, avg_water, avg_nutrients
+
+    def __consume(self, resource_maps, boxes, consumption_factors, start, stop):
+        x_min, x_max, y_min, y_max = boxes
+        if start > 0 or stop < self.__width:
+            rows = np.flatnonzero((x_max > start) & (x_min < stop))
+            x_min = np.clip(x_min[rows], start, stop)
+            x_max = np.clip(x_max[rows], start, stop)
+            boxes = (x_min, x_max, y_min[rows], y_max[rows])
+            consumption_factors = consumption_factors[rows]
+
+        for x_min, x_max, y_min, y_max, consumption_factor in zip(
+                *(bound.tolist() for bound in boxes), consumption_factors.tolist()):
+            if x_min >= x_max or y_min >= y_max:
+                continue
+            for resource_map in resource_maps:
+                resource_map[x_min:x_max, y_min:y_max] *= (1 - consumption_factor)
+
+    def remove_dead_plants(self):
+        with self.__timer.phase("remove_dead"):
+            self.__dead_plants_count += self.__population.remove_dead()
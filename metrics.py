@@ -0,0 +1,126 @@
+import json
+import os
+
+import numpy as np
+
+from plants import PLANT_TYPES, SPECIES_TYPES
+
+
+SPECIES_COLUMNS = tuple(f"alive_{plant_type.__name__.lower()}" for plant_type in SPECIES_TYPES)
+
+METRIC_COLUMNS = dict(
+    [("tick", np.int64)]
+    + [(name, np.int32) for name in SPECIES_COLUMNS]
+    + [
+        ("mean_health", np.float64),
+        ("min_health", np.float64),
+        ("deaths", np.int32),
+        ("mean_water", np.float64),
+        ("mean_nutrients", np.float64),
+        ("mean_light", np.float64),
+        ("raining", np.int8)
+    ]
+)
+
+
+class MetricsRecorder:
+    def __init__(self, capacity=4096, path=None, append=False):
+        self.__capacity = capacity
+        self.__path = path
+        self.__columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in METRIC_COLUMNS.items()}
+        self.__count = 0
+        self.__flushed = 0
+        self.__last_dead_count = None
+        self.__last_stored_tick = None
+        self.__species_codes = [PLANT_TYPES.index(plant_type) for plant_type in SPECIES_TYPES]
+
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+            if append and os.path.exists(os.path.join(path, "schema.json")):
+                ticks = load_metrics(path, mmap=False)["tick"]
+                if len(ticks):
+                    self.__last_stored_tick = int(ticks[-1])
+            else:
+                for name in METRIC_COLUMNS:
+                    open(os.path.join(path, f"{name}.bin"), "wb").close()
+            with open(os.path.join(path, "schema.json"), "w", encoding="utf-8") as f:
+                json.dump({name: np.dtype(dtype).str for name, dtype in METRIC_COLUMNS.items()}, f)
+
+    def __len__(self):
+        return min(self.__count, self.__capacity)
+
+    def get_count(self):
+        return self.__count
+
+    def record(self, environment):
+        if self.__path is not None and self.__count - self.__flushed == self.__capacity:
+            self.flush()
+
+        dead_count = environment.get_dead_plants_count()
+        if self.__last_dead_count is None:
+            self.__last_dead_count = dead_count
+            if environment.get_tick() == self.__last_stored_tick:
+                return
+
+        population = environment.get_population()
+        health = population.get_column("health")
+        species_count = np.bincount(population.get_column("species"), minlength=len(PLANT_TYPES))
+        resources = environment.get_mean_resources()
+
+        row = self.__count % self.__capacity
+        columns = self.__columns
+        columns["tick"][row] = environment.get_tick()
+        for name, code in zip(SPECIES_COLUMNS, self.__species_codes):
+            columns[name][row] = species_count[code]
+        columns["mean_health"][row] = health.mean() if len(health) else 0.0
+        columns["min_health"][row] = health.min() if len(health) else 0.0
+        columns["deaths"][row] = dead_count - self.__last_dead_count
+        columns["mean_water"][row] = resources["water"]
+        columns["mean_nutrients"][row] = resources["nutrients"]
+        columns["mean_light"][row] = resources["light"]
+        columns["raining"][row] = environment.is_raining()
+
+        self.__last_dead_count = dead_count
+        self.__count += 1
+
+    def latest(self):
+        if self.__count == 0:
+            return None
+        row = (self.__count - 1) % self.__capacity
+        return {name: column[row].item() for name, column in self.__columns.items()}
+
+    def get_history(self, name, last=None):
+        size = len(self)
+        if last is not None:
+            size = min(size, last)
+        rows = np.arange(self.__count - size, self.__count) % self.__capacity
+        return self.__columns[name][rows]
+
+    def flush(self):
+        if self.__path is None or self.__flushed == self.__count:
+            return
+
+        rows = np.arange(self.__flushed, self.__count) % self.__capacity
+        for name, column in self.__columns.items():
+            with open(os.path.join(self.__path, f"{name}.bin"), "ab") as f:
+                column[rows].tofile(f)
+        self.__flushed = self.__count
+
+    def close(self):
+        self.flush()
+
+
+def load_metrics(path, mmap=True):
+    with open(os.path.join(path, "schema.json"), encoding="utf-8") as f:
+        schema = json.load(f)
+
+    columns = {}
+    for name, dtype in schema.items():
+        column_path = os.path.join(path, f"{name}.bin")
+        if not os.path.exists(column_path) or os.path.getsize(column_path) == 0:
+            columns[name] = np.zeros(0, dtype=dtype)
+        elif mmap:
+            columns[name] = np.memmap(column_path, dtype=dtype, mode="r")
+        else:
+            columns[name] = np.fromfile(column_path, dtype=dtype)
+    return columns
@@ -0,0 +1,109 @@
+import time
+import tkinter as tk
+
+import numpy as np
+from matplotlib import colormaps                                                                                        #type: ignore
+
+from environment import MAP_LAYERS
+
+
+LAYER_STYLES = {
+    "light": ("inferno", 0.0, 100.0),
+    "water": ("Blues", 0.0, 200.0),
+    "nutrients": ("YlGn", 0.0, 200.0),
+    "shade": ("Greys_r", 0.6, 1.0)
+}
+
+_lookup_tables = {}
+
+
+def lookup_table(layer):
+    table = _lookup_tables.get(layer)
+    if table is None:
+        colormap = colormaps[LAYER_STYLES[layer][0]]
+        table = (colormap(np.linspace(0.0, 1.0, 256))[:, :3] * 255).round().astype(np.uint8)
+        _lookup_tables[layer] = table
+    return table
+
+
+def heatmap_rgb(values, layer, scale=1, xs=None, ys=None):
+    _, low, high = LAYER_STYLES[layer]
+    if xs is None:
+        xs = np.arange(values.shape[0] * scale)
+    if ys is None:
+        ys = np.arange(values.shape[1] * scale)
+    values = values[np.ix_(xs // scale, ys // scale)]
+    levels = np.empty(values.shape, dtype=np.float32)
+    np.subtract(values, low, out=levels, casting="unsafe")
+    levels *= 255.0 / (high - low)
+    np.clip(levels, 0, 255, out=levels)
+    indices = levels.astype(np.uint8)
+    return np.take(lookup_table(layer), np.ascontiguousarray(indices.T), axis=0)
+
+
+def encode_ppm(rgb):
+    height, width = rgb.shape[:2]
+    return b"P6 %d %d 255\n" % (width, height) + np.ascontiguousarray(rgb).tobytes()
+
+
+class HeatmapOverlay:
+    def __init__(self, canvas, viewport, min_interval=0.5):
+        self.__canvas = canvas
+        self.__viewport = viewport
+        self.__min_interval = min_interval
+        self.__layer = None
+        self.__image = None
+        self.__item = None
+        self.__view = None
+        self.__tick = None
+        self.__built_at = 0.0
+        self.__build_count = 0
+
+    def get_layer(self):
+        return self.__layer
+
+    def get_build_count(self):
+        return self.__build_count
+
+    def set_layer(self, layer):
+        if layer is not None and layer not in MAP_LAYERS:
+            raise ValueError(f"Неизвестный слой карты: {layer}")
+        self.__layer = layer
+        self.__view = None
+        if layer is None:
+            self.clear()
+
+    def clear(self):
+        if self.__item is not None:
+            self.__canvas.delete(self.__item)
+        self.__item = None
+        self.__image = None
+        self.__view = None
+
+    def draw(self, state):
+        if self.__layer is None:
+            return
+
+        view = (self.__layer, self.__viewport.get_revision())
+        if view == self.__view:
+            if state.get_tick() == self.__tick or time.perf_counter() - self.__built_at < self.__min_interval:
+                return
+
+        layer = state.get_layer(self.__layer)
+        if layer is None:
+            return
+        values, scale = layer
+
+        xs, ys = self.__viewport.get_pixel_cells()
+        rgb = heatmap_rgb(values, self.__layer, scale, xs, ys)
+        self.__image = tk.PhotoImage(master=self.__canvas, data=encode_ppm(rgb), format="PPM")
+        if self.__item is None:
+            self.__item = self.__canvas.create_image(0, 0, anchor=tk.NW, image=self.__image, tags="overlay")
+            self.__canvas.tag_lower(self.__item)
+        else:
+            self.__canvas.itemconfig(self.__item, image=self.__image)
+
+        self.__view = view
+        self.__tick = state.get_tick()
+        self.__built_at = time.perf_counter()
+        self.__build_count += 1
@@ -0,0 +1,54 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+def split_range(size, parts):
+    bounds = [size * k // parts for k in range(parts + 1)]
+    return [(start, stop) for start, stop in zip(bounds[:-1], bounds[1:]) if start < stop]
+
+
+class TilePool:
+    def __init__(self, threads=None):
+        self.__threads = threads or os.cpu_count() or 1
+        self.__executor = ThreadPoolExecutor(max_workers=self.__threads, thread_name_prefix="tile")
+
+    def get_threads(self):
+        return self.__threads
+
+    def close(self):
+        self.__executor.shutdown()
+
+    def run(self, task, tiles):
+        return list(self.__executor.map(lambda tile: task(*tile), tiles))
+
+    def for_bands(self, task, size):
+        return self.run(task, split_range(size, self.__threads))
+
+    def fill(self, values, value):
+        self.for_bands(lambda start, stop: values[start:stop].fill(value), len(values))
+
+    def add_clip(self, values, amount, low, high):
+        def task(start, stop):
+            band = values[start:stop]
+            band += amount
+            np.clip(band, low, high, out=band)
+
+        self.for_bands(task, len(values))
+
+    def multiply(self, values, factors):
+        def task(start, stop):
+            band = values[start:stop]
+            band *= factors[start:stop]
+
+        self.for_bands(task, len(values))
+
+    def cumsum2d(self, values, out):
+        if values.dtype != out.dtype:
+            self.for_bands(lambda start, stop: np.copyto(out[start:stop], values[start:stop]), len(out))
+            values = out
+        self.for_bands(
+            lambda start, stop: np.cumsum(values[:, start:stop], axis=0, out=out[:, start:stop]), out.shape[1]
+        )
+        self.for_bands(lambda start, stop: np.cumsum(out[start:stop], axis=1, out=out[start:stop]), len(out))
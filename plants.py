@@ -0,0 +1,328 @@
+import itertools
+import numpy as np
+
+
+LIGHT_SUN = 0
+LIGHT_SHADE = 1
+
+
+class Plant:
+    SPECIES = "Растение"
+    COLOR = "#32CD32"
+    MAX_RADIUS = 50
+    MAX_HEIGHT = 20
+    GROWTH_RATE = 0.05
+    AGGRESSIVENESS = 0.5
+    LIGHT_PREF = LIGHT_SUN
+
+    def __init__(self, population, plant_id):
+        self.__population = population
+        self.__id = plant_id
+        self.__index = -1
+        self.__generation = -1
+        self.__selected = False
+
+    def __row(self):
+        if self.__generation != self.__population.get_generation():
+            self.__index = self.__population.index_of(self.__id)
+            self.__generation = self.__population.get_generation()
+        return self.__index
+
+    def __value(self, column):
+        return self.__population.get_column(column)[self.__row()].item()
+
+    def get_id(self):
+        return self.__id
+
+    def get_x(self):
+        return self.__value("x")
+
+    def get_y(self):
+        return self.__value("y")
+
+    def set_position(self, x, y):
+        self.__population.move(self.__row(), x, y)
+
+    def get_radius(self):
+        return self.__value("radius")
+
+    def get_height(self):
+        return self.__value("height")
+
+    def get_health(self):
+        return self.__value("health")
+
+    def get_aggressiveness(self):
+        return self.__value("aggressiveness")
+
+    def get_resources(self):
+        return {
+            "light": self.__value("light"),
+            "water": self.__value("water"),
+            "nutrients": self.__value("nutrients")
+        }
+
+    def get_color(self):
+        return self.COLOR
+
+    def get_species(self):
+        return self.SPECIES
+
+    def is_selected(self):
+        return self.__selected
+
+    def set_selected(self, value):
+        self.__selected = value
+
+    def grow(self, resources):
+        self.__population.grow_all(
+            np.array([resources["light"]], dtype=float),
+            np.array([resources["water"]], dtype=float),
+            np.array([resources["nutrients"]], dtype=float),
+            rows=np.array([self.__row()])
+        )
+
+    def get_info(self):
+        resources = self.get_resources()
+        return (
+            f"Вид: {self.SPECIES}\n"
+            f"Радиус: {self.get_radius():.1f}/{self.MAX_RADIUS}\n"
+            f"Высота: {self.get_height():.1f}/{self.MAX_HEIGHT}\n"
+            f"Здоровье: {int(self.get_health())}%\n"
+            f"Ресурсы: Свет={min(int(resources['light']), 100)}%, "
+            f"Вода={min(int(resources['water']), 100)}%, "
+            f"Питание={min(int(resources['nutrients']), 100)}%"
+        )
+
+
+class Tree(Plant):
+    SPECIES = "Дерево"
+    COLOR = "#228B22"
+    MAX_RADIUS = 60
+    MAX_HEIGHT = 30
+    GROWTH_RATE = 0.04
+    AGGRESSIVENESS = 0.6
+
+
+class Shrub(Plant):
+    SPECIES = "Кустарник"
+    COLOR = "#32CD32"
+    MAX_RADIUS = 40
+    MAX_HEIGHT = 10
+    GROWTH_RATE = 0.08
+    AGGRESSIVENESS = 0.5
+    LIGHT_PREF = LIGHT_SHADE
+
+
+class Flower(Plant):
+    SPECIES = "Цветок"
+    COLOR = "#FF69B4"
+    MAX_RADIUS = 25
+    MAX_HEIGHT = 5
+    GROWTH_RATE = 0.12
+    AGGRESSIVENESS = 0.7
+    LIGHT_PREF = LIGHT_SUN
+
+
+class Fern(Plant):
+    SPECIES = "Папоротник"
+    COLOR = "#20B2AA"
+    MAX_RADIUS = 35
+    MAX_HEIGHT = 8
+    GROWTH_RATE = 0.09
+    AGGRESSIVENESS = 0.4
+    LIGHT_PREF = LIGHT_SHADE
+
+
+PLANT_TYPES = (Plant, Tree, Shrub, Flower, Fern)
+SPECIES_TYPES = (Tree, Shrub, Flower, Fern)
+
+
+class PlantPopulation:
+    __COLUMNS = {
+        "id": np.int64,
+        "x": np.float64,
+        "y": np.float64,
+        "radius": np.float64,
+        "height": np.float64,
+        "health": np.float64,
+        "growth_rate": np.float64,
+        "aggressiveness": np.float64,
+        "light_pref": np.int8,
+        "species": np.int8,
+        "max_radius": np.float64,
+        "max_height": np.float64,
+        "light": np.float64,
+        "water": np.float64,
+        "nutrients": np.float64
+    }
+    __TRAITS = {
+        "growth_rate": "GROWTH_RATE",
+        "aggressiveness": "AGGRESSIVENESS",
+        "light_pref": "LIGHT_PREF",
+        "max_radius": "MAX_RADIUS",
+        "max_height": "MAX_HEIGHT"
+    }
+
+    def __init__(self, capacity=64):
+        self.__size = 0
+        self.__generation = 0
+        self.__revision = 0
+        self.__columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in self.__COLUMNS.items()}
+        self.__plants = []
+
+    def __len__(self):
+        return self.__size
+
+    def get_plants(self):
+        return self.__plants
+
+    def get_generation(self):
+        return self.__generation
+
+    def get_revision(self):
+        return self.__revision
+
+    def get_column(self, name):
+        return self.__columns[name][:self.__size]
+
+    def get_columns(self):
+        return {name: self.get_column(name) for name in self.__columns}
+
+    def load_columns(self, columns):
+        size = len(columns["id"])
+        self.__columns = {
+            name: np.array(columns[name], dtype=dtype) for name, dtype in self.__COLUMNS.items()
+        }
+        self.__size = size
+        self.__plants = [
+            PLANT_TYPES[code](self, plant_id)
+            for code, plant_id in zip(self.get_column("species").tolist(), self.get_column("id").tolist())
+        ]
+        self.__generation += 1
+        self.__revision += 1
+
+    def index_of(self, plant_id):
+        ids = self.get_column("id")
+        index = int(np.searchsorted(ids, plant_id))
+        if index == self.__size or ids[index] != plant_id:
+            raise KeyError(plant_id)
+        return index
+
+    def __reserve(self, size):
+        capacity = len(self.__columns["id"])
+        if size <= capacity:
+            return
+
+        capacity = max(size, 2 * capacity)
+        for name, column in self.__columns.items():
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self.__size] = column[:self.__size]
+            self.__columns[name] = grown
+
+    def add(self, plant_class, plant_id, x, y, radius, height):
+        return self.extend(
+            np.array([PLANT_TYPES.index(plant_class)]), np.array([plant_id]),
+            np.array([x]), np.array([y]), np.array([radius]), np.array([height])
+        )[0]
+
+    def extend(self, species, ids, xs, ys, radii, heights):
+        if len(ids) == 0:
+            return []
+
+        last_id = self.__columns["id"][self.__size - 1] if self.__size else None
+        if np.any(np.diff(ids) <= 0) or (last_id is not None and ids[0] <= last_id):
+            raise ValueError("Идентификаторы растений должны возрастать")
+
+        start = self.__size
+        stop = start + len(ids)
+        self.__reserve(stop)
+
+        columns = self.__columns
+        columns["id"][start:stop] = ids
+        columns["x"][start:stop] = xs
+        columns["y"][start:stop] = ys
+        columns["radius"][start:stop] = radii
+        columns["height"][start:stop] = heights
+        columns["health"][start:stop] = 100
+        columns["species"][start:stop] = species
+        for name, trait in self.__TRAITS.items():
+            columns[name][start:stop] = np.array([getattr(t, trait) for t in PLANT_TYPES])[species]
+        for name in ("light", "water", "nutrients"):
+            columns[name][start:stop] = 0
+        self.__size = stop
+        self.__revision += 1
+
+        plants = [PLANT_TYPES[code](self, plant_id) for code, plant_id in zip(species.tolist(), ids.tolist())]
+        self.__plants.extend(plants)
+        return plants
+
+    def move(self, rows, xs, ys):
+        self.__columns["x"][rows] = xs
+        self.__columns["y"][rows] = ys
+        self.__revision += 1
+
+    def clamp_to(self, width, height, margin=10):
+        xs = self.get_column("x")
+        ys = self.get_column("y")
+        radii = self.get_column("radius")
+
+        outside = (xs - radii < 0) | (xs + radii > width) | (ys - radii < 0) | (ys + radii > height)
+        if not outside.any():
+            return
+
+        xs[outside] = np.maximum(radii + margin, np.minimum(width - radii - margin, xs))[outside]
+        ys[outside] = np.maximum(radii + margin, np.minimum(height - radii - margin, ys))[outside]
+        self.__revision += 1
+
+    def grow_all(self, light, water, nutrients, rows=None):
+        if rows is None:
+            rows = slice(0, self.__size)
+
+        columns = self.__columns
+        columns["light"][rows] = light
+        columns["water"][rows] = water
+        columns["nutrients"][rows] = nutrients
+        self.__revision += 1
+
+        growth_factor = np.minimum(
+            np.minimum(np.minimum(light, 100) / 100, np.minimum(water, 100) / 100),
+            np.minimum(nutrients, 100) / 100
+        )
+
+        light_pref = columns["light_pref"][rows]
+        growth_factor[(light_pref == LIGHT_SUN) & (light < 70)] *= 0.8
+        growth_factor[(light_pref == LIGHT_SHADE) & (light > 80)] *= 0.9
+
+        growth_rate = columns["growth_rate"][rows]
+        radius = columns["radius"][rows]
+        height = columns["height"][rows]
+        max_radius = columns["max_radius"][rows]
+        max_height = columns["max_height"][rows]
+
+        radius_growth = growth_rate * growth_factor * (max_radius - radius)
+        height_growth = growth_rate * growth_factor * (max_height - height)
+
+        columns["radius"][rows] = np.minimum(radius + radius_growth, max_radius)
+        columns["height"][rows] = np.minimum(height + height_growth, max_height)
+
+        health = columns["health"][rows]
+        columns["health"][rows] = np.where(
+            growth_factor < 0.5, health - 2,
+            np.where(growth_factor > 0.6, np.minimum(100, health + 1), health)
+        )
+
+    def remove_dead(self):
+        alive = self.get_column("health") > 0
+        dead_count = self.__size - int(np.count_nonzero(alive))
+        if dead_count == 0:
+            return 0
+
+        survivors = int(np.count_nonzero(alive))
+        for name, column in self.__columns.items():
+            column[:survivors] = column[:self.__size][alive]
+        self.__size = survivors
+        self.__plants = list(itertools.compress(self.__plants, alive))
+        self.__generation += 1
+        self.__revision += 1
+        return dead_count
@@ -0,0 +1,140 @@
+import threading
+import time
+
+import numpy as np
+
+
+class _Phase:
+    def __init__(self, timer, name):
+        self.__timer = timer
+        self.__name = name
+        self.__started = 0.0
+
+    def __enter__(self):
+        self.__started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.__timer.add(self.__name, time.perf_counter() - self.__started)
+        return False
+
+
+class _NullPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+class NullTimer:
+    __PHASE = _NullPhase()
+
+    def phase(self, name):
+        return self.__PHASE
+
+
+NULL_TIMER = NullTimer()
+
+
+class PhaseTimer:
+    def __init__(self):
+        self.__phases = {}
+        self.__totals = {}
+        self.__counts = {}
+
+    def phase(self, name):
+        phase = self.__phases.get(name)
+        if phase is None:
+            phase = _Phase(self, name)
+            self.__phases[name] = phase
+        return phase
+
+    def add(self, name, seconds):
+        self.__totals[name] = self.__totals.get(name, 0.0) + seconds
+        self.__counts[name] = self.__counts.get(name, 0) + 1
+
+    def get_totals(self):
+        return dict(self.__totals)
+
+    def get_means(self):
+        return {name: total / self.__counts[name] for name, total in self.__totals.items()}
+
+    def reset(self):
+        self.__totals.clear()
+        self.__counts.clear()
+
+
+class RollingPhaseTimer(PhaseTimer):
+    def __init__(self, window=120):
+        super().__init__()
+        self.__window = window
+        self.__samples = {}
+        self.__counts = {}
+        self.__lock = threading.Lock()
+
+    def add(self, name, seconds):
+        with self.__lock:
+            super().add(name, seconds)
+            samples = self.__samples.get(name)
+            if samples is None:
+                samples = np.zeros(self.__window)
+                self.__samples[name] = samples
+                self.__counts[name] = 0
+            samples[self.__counts[name] % self.__window] = seconds
+            self.__counts[name] += 1
+
+    def get_totals(self):
+        with self.__lock:
+            return super().get_totals()
+
+    def get_means(self):
+        with self.__lock:
+            return super().get_means()
+
+    def get_stats(self):
+        with self.__lock:
+            snapshot = {name: (samples.copy(), self.__counts[name]) for name, samples in self.__samples.items()}
+
+        stats = {}
+        for name, (samples, count) in snapshot.items():
+            recent = samples[:min(count, self.__window)]
+            stats[name] = {
+                "mean": float(recent.mean()),
+                "p95": float(np.percentile(recent, 95)),
+                "last": float(samples[(count - 1) % self.__window])
+            }
+        return stats
+
+    def reset(self):
+        with self.__lock:
+            super().reset()
+            self.__samples.clear()
+            self.__counts.clear()
+
+
+class RateMeter:
+    def __init__(self, window=60):
+        self.__stamps = np.zeros(window)
+        self.__totals = np.zeros(window)
+        self.__total = 0
+        self.__count = 0
+
+    def tick(self, ticks=1):
+        self.__total += ticks
+        self.__stamps[self.__count % len(self.__stamps)] = time.perf_counter()
+        self.__totals[self.__count % len(self.__totals)] = self.__total
+        self.__count += 1
+
+    def get_rate(self):
+        size = min(self.__count, len(self.__stamps))
+        if size < 2:
+            return 0.0
+        newest = (self.__count - 1) % len(self.__stamps)
+        oldest = (self.__count - size) % len(self.__stamps)
+        seconds = self.__stamps[newest] - self.__stamps[oldest]
+        return float((self.__totals[newest] - self.__totals[oldest]) / seconds) if seconds > 0 else 0.0
+
+    def reset(self):
+        self.__total = 0
+        self.__count = 0
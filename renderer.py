@@ -0,0 +1,155 @@
+import numpy as np
+
+from plants import PLANT_TYPES
+
+
+LABEL_MIN_RADIUS = 4.0
+OVAL_MIN_RADIUS = 1.5
+MAX_DETAILED_PLANTS = 4000
+DENSITY_CELL_SIZE = 8
+DENSITY_LEVELS = (0.1, 0.3, 0.6)
+DENSITY_COLORS = ("#c8e6c9", "#81c784", "#43a047", "#1b5e20")
+
+
+class PlantRenderer:
+    def __init__(self, canvas, viewport, on_click=None, max_detailed=MAX_DETAILED_PLANTS):
+        self.__canvas = canvas
+        self.__viewport = viewport
+        self.__on_click = on_click
+        self.__max_detailed = max_detailed
+        self.__items = {}
+        self.__drawn = {}
+        self.__cells = {}
+        self.__cell_grid = None
+        self.__canvas.bind("<Button-1>", self.__handle_click)
+
+    def get_viewport(self):
+        return self.__viewport
+
+    def get_item_count(self):
+        return sum(1 if text is None else 2 for _, text in self.__items.values()) + len(self.__cells)
+
+    def get_detailed_count(self):
+        return len(self.__items)
+
+    def get_density_cell_count(self):
+        return len(self.__cells)
+
+    def clear(self):
+        self.__canvas.delete("plant")
+        self.__canvas.delete("density")
+        self.__items.clear()
+        self.__drawn.clear()
+        self.__cells.clear()
+
+    def draw(self, population):
+        width, height = self.__viewport.get_size()
+        xs, ys = self.__viewport.to_canvas(population.get_column("x"), population.get_column("y"))
+        radii = population.get_column("radius") * self.__viewport.get_zoom()
+
+        visible = (xs + radii >= 0) & (xs - radii <= width) & (ys + radii >= 0) & (ys - radii <= height)
+        rows = np.flatnonzero(visible & (radii >= OVAL_MIN_RADIUS))
+        if len(rows) > self.__max_detailed:
+            rows = np.sort(rows[np.argpartition(radii[rows], -self.__max_detailed)[-self.__max_detailed:]])
+        visible[rows] = False
+        dots = np.flatnonzero(visible)
+
+        self.__draw_plants(population, rows, xs[rows], ys[rows], radii[rows])
+        self.__draw_density(xs[dots], ys[dots], radii[dots], width, height)
+
+    def __draw_plants(self, population, rows, xs, ys, radii):
+        canvas = self.__canvas
+        ids = population.get_column("id")[rows].tolist()
+        for plant_id in self.__items.keys() - set(ids):
+            self.__remove(plant_id)
+
+        for plant_id, x, y, r, health, species in zip(
+                ids, xs.tolist(), ys.tolist(), radii.tolist(),
+                population.get_column("health")[rows].tolist(),
+                population.get_column("species")[rows].tolist()):
+            if health > 70:
+                color = PLANT_TYPES[species].COLOR
+            elif health > 40:
+                color = "#FFA500"
+            else:
+                color = "#FF0000"
+
+            state = (round(x, 1), round(y, 1), round(r, 1), color, r >= LABEL_MIN_RADIUS)
+            items = self.__items.get(plant_id)
+
+            if items is None:
+                oval = canvas.create_oval(
+                    x - r, y - r, x + r, y + r,
+                    fill=color, outline="#333", width=1, tags="plant"
+                )
+                self.__items[plant_id] = (oval, self.__create_label(x, y, species) if state[4] else None)
+            elif state != self.__drawn[plant_id]:
+                oval, text = items
+                drawn = self.__drawn[plant_id]
+                if state[:3] != drawn[:3]:
+                    canvas.coords(oval, x - r, y - r, x + r, y + r)
+                    if text is not None:
+                        canvas.coords(text, x, y)
+                if color != drawn[3]:
+                    canvas.itemconfig(oval, fill=color)
+                if state[4] != drawn[4]:
+                    if text is None:
+                        text = self.__create_label(x, y, species)
+                    else:
+                        canvas.delete(text)
+                        text = None
+                    self.__items[plant_id] = (oval, text)
+
+            self.__drawn[plant_id] = state
+
+    def __create_label(self, x, y, species):
+        return self.__canvas.create_text(
+            x, y, text=PLANT_TYPES[species].SPECIES[0],
+            fill="white", font=("Arial", 10, "bold"), tags="plant"
+        )
+
+    def __draw_density(self, xs, ys, radii, width, height):
+        canvas = self.__canvas
+        size = DENSITY_CELL_SIZE
+        grid = (-(-int(width) // size), -(-int(height) // size))
+        if grid != self.__cell_grid:
+            canvas.delete("density")
+            self.__cells.clear()
+            self.__cell_grid = grid
+
+        columns = np.clip((xs // size).astype(np.intp), 0, grid[0] - 1)
+        rows = np.clip((ys // size).astype(np.intp), 0, grid[1] - 1)
+        coverage = np.bincount(
+            columns * grid[1] + rows, weights=np.pi * radii ** 2, minlength=grid[0] * grid[1]
+        ) / size ** 2
+        occupied = np.flatnonzero(coverage)
+        cells = dict(zip(occupied.tolist(), np.digitize(coverage[occupied], DENSITY_LEVELS).tolist()))
+
+        for key in self.__cells.keys() - cells.keys():
+            canvas.delete(self.__cells.pop(key)[0])
+
+        created = False
+        for key, level in cells.items():
+            color = DENSITY_COLORS[level]
+            cell = self.__cells.get(key)
+            if cell is None:
+                x, y = key // grid[1] * size, key % grid[1] * size
+                item = canvas.create_rectangle(x, y, x + size, y + size, fill=color, outline="", tags="density")
+                self.__cells[key] = (item, color)
+                created = True
+            elif cell[1] != color:
+                canvas.itemconfig(cell[0], fill=color)
+                self.__cells[key] = (cell[0], color)
+
+        if created:
+            canvas.tag_raise("plant")
+
+    def __remove(self, plant_id):
+        for item in self.__items.pop(plant_id):
+            if item is not None:
+                self.__canvas.delete(item)
+        del self.__drawn[plant_id]
+
+    def __handle_click(self, event):
+        if self.__on_click is not None:
+            self.__on_click(*self.__viewport.to_world(event.x, event.y))
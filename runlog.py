@@ -0,0 +1,188 @@
+import json
+import os
+import re
+
+import numpy as np
+
+from checkpoint import load_checkpoint, save_checkpoint
+
+
+EVENTS_FILE = "events.jsonl"
+KEYFRAME_PATTERN = re.compile(r"keyframe_(\d+)_(\d+)\.npz$")
+
+
+def keyframe_path(path, run, tick):
+    return os.path.join(path, f"keyframe_{run:04d}_{tick:010d}.npz")
+
+
+def list_keyframes(path):
+    keyframes = {}
+    for name in os.listdir(path):
+        match = KEYFRAME_PATTERN.match(name)
+        if match:
+            keyframes.setdefault(int(match.group(1)), []).append(int(match.group(2)))
+    return {run: sorted(ticks) for run, ticks in keyframes.items()}
+
+
+class RunRecorder:
+    def __init__(self, path, keyframe_every=500):
+        if keyframe_every <= 0:
+            raise ValueError(f"Интервал ключевых кадров должен быть положительным: {keyframe_every}")
+
+        os.makedirs(path, exist_ok=True)
+        self.__path = path
+        self.__keyframe_every = keyframe_every
+        self.__run = max(list_keyframes(path), default=-1)
+        self.__events = open(os.path.join(path, EVENTS_FILE), "a", encoding="utf-8")
+        self.__environment = None
+        self.__last_tick = None
+        self.__logged_tick = None
+        self.__raining = False
+        self.__generation = None
+        self.__ids = None
+
+    def get_path(self):
+        return self.__path
+
+    def get_run(self):
+        return self.__run
+
+    def get_keyframe_every(self):
+        return self.__keyframe_every
+
+    def get_last_tick(self):
+        return self.__last_tick
+
+    def start(self, environment):
+        if self.__last_tick is not None:
+            self.__write("end", self.__last_tick)
+        self.__run += 1
+        self.__last_tick = environment.get_tick()
+        meta, _ = environment.get_state()
+        config = {name: value for name, value in meta.items() if name not in ("rng_state", "tick")}
+        self.__write("start", environment.get_tick(), plants=len(environment.get_population()), **config)
+        save_checkpoint(environment, keyframe_path(self.__path, self.__run, environment.get_tick()))
+        self.attach(environment)
+        self.flush()
+
+    def attach(self, environment):
+        population = environment.get_population()
+        self.__environment = environment
+        self.__raining = environment.is_raining()
+        self.__generation = population.get_generation()
+        self.__ids = population.get_column("id").copy()
+
+    def record(self, environment):
+        if environment is not self.__environment:
+            self.attach(environment)
+            return
+
+        tick = environment.get_tick()
+        population = environment.get_population()
+        raining = environment.is_raining()
+        died = None
+        if population.get_generation() != self.__generation:
+            ids = population.get_column("id")
+            died = np.setdiff1d(self.__ids, ids, assume_unique=True)
+            self.__generation = population.get_generation()
+            self.__ids = ids.copy()
+
+        if tick > self.__last_tick:
+            if raining and not self.__raining:
+                self.__write("rain", tick)
+            if died is not None and len(died):
+                self.__write("deaths", tick, ids=died.tolist())
+            if tick % self.__keyframe_every == 0:
+                save_checkpoint(environment, keyframe_path(self.__path, self.__run, tick))
+                self.__last_tick = self.__logged_tick = tick
+                self.flush()
+            self.__last_tick = tick
+        self.__raining = raining
+
+    def action(self, name, value=None, tick=None):
+        if tick is None:
+            tick = self.__environment.get_tick() if self.__environment is not None else 0
+        self.__write("action", tick, name=name, value=value)
+
+    def flush(self):
+        if self.__last_tick is not None and self.__last_tick != self.__logged_tick:
+            self.__write("progress", self.__last_tick)
+        self.__events.flush()
+
+    def close(self):
+        if self.__events.closed:
+            return
+        if self.__last_tick is not None:
+            self.__write("end", self.__last_tick)
+        self.__events.close()
+
+    def __write(self, kind, tick, **fields):
+        event = dict(run=self.__run, tick=tick, type=kind, **fields)
+        self.__events.write(json.dumps(event, ensure_ascii=False) + "\n")
+        self.__logged_tick = max(tick, self.__logged_tick if self.__logged_tick is not None else tick)
+
+
+class RunLog:
+    def __init__(self, path):
+        self.__path = path
+        self.__events = []
+        with open(os.path.join(path, EVENTS_FILE), encoding="utf-8") as f:
+            for line in f:
+                try:
+                    self.__events.append(json.loads(line))
+                except ValueError:
+                    break
+        self.__keyframes = list_keyframes(path)
+
+    def get_path(self):
+        return self.__path
+
+    def get_runs(self):
+        return sorted(self.__keyframes)
+
+    def __resolve(self, run):
+        if run is None:
+            run = max(self.__keyframes, default=None)
+        if run not in self.__keyframes:
+            raise ValueError(f"В журнале нет прогона {run}")
+        return run
+
+    def get_events(self, run=None, kinds=None, start=None, stop=None):
+        run = self.__resolve(run)
+        return [
+            event for event in self.__events
+            if event["run"] == run
+            and (kinds is None or event["type"] in kinds)
+            and (start is None or event["tick"] >= start)
+            and (stop is None or event["tick"] < stop)
+        ]
+
+    def get_start(self, run=None):
+        events = self.get_events(run, kinds=("start",))
+        return events[0] if events else None
+
+    def get_keyframe_ticks(self, run=None):
+        return list(self.__keyframes[self.__resolve(run)])
+
+    def get_last_tick(self, run=None):
+        run = self.__resolve(run)
+        ticks = [event["tick"] for event in self.__events if event["run"] == run]
+        return max(ticks + self.__keyframes[run])
+
+    def get_keyframe_tick(self, tick, run=None):
+        ticks = self.get_keyframe_ticks(run)
+        if tick < ticks[0]:
+            raise ValueError(f"Нет ключевого кадра до тика {tick}: первый кадр на тике {ticks[0]}")
+        return ticks[np.searchsorted(ticks, tick, side="right") - 1]
+
+    def seek(self, tick, run=None, chunk_dir=None, threads=None, extrapolate=False):
+        run = self.__resolve(run)
+        last_tick = self.get_last_tick(run)
+        if not extrapolate and tick > last_tick:
+            raise ValueError(f"Тик {tick} за концом журнала: прогон {run} записан до тика {last_tick}")
+        keyframe_tick = self.get_keyframe_tick(tick, run)
+        environment = load_checkpoint(keyframe_path(self.__path, run, keyframe_tick), chunk_dir=chunk_dir, threads=threads)
+        for _ in range(tick - keyframe_tick):
+            environment.update_resources()
+            environment.remove_dead_plants()
+        return environment
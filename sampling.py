@@ -0,0 +1,126 @@
+import numpy as np
+
+
+TABLE_CELL_COST = 8
+BOX_OVERHEAD_CELLS = 4000
+
+
+def footprint_boxes(xs, ys, radii, width, height):
+    x_min = np.clip((xs - radii).astype(np.int64), 0, width)
+    x_max = np.clip((xs + radii).astype(np.int64), 0, width)
+    y_min = np.clip((ys - radii).astype(np.int64), 0, height)
+    y_max = np.clip((ys + radii).astype(np.int64), 0, height)
+    return x_min, x_max, y_min, y_max
+
+
+def box_areas(boxes):
+    x_min, x_max, y_min, y_max = boxes
+    return np.maximum(x_max - x_min, 0) * np.maximum(y_max - y_min, 0)
+
+
+def box_sums(values, boxes):
+    return np.array([
+        values[x_min:x_max, y_min:y_max].sum(dtype=np.float64)
+        for x_min, x_max, y_min, y_max in zip(*(bounds.tolist() for bounds in boxes))
+    ], dtype=np.float64)
+
+
+class ResourceSampler:
+    def __init__(self, width, height, pool=None):
+        self.__pool = pool
+        self.__table = np.zeros((width + 1, height + 1))
+
+    def sample(self, values, boxes):
+        sums = self.sum(values, boxes)
+        areas = box_areas(boxes)
+
+        means = np.zeros(len(sums))
+        np.divide(sums, areas, out=means, where=areas > 0)
+        return means
+
+    def prefers_boxes(self, values, boxes):
+        direct_cost = len(boxes[0]) * BOX_OVERHEAD_CELLS + int(box_areas(boxes).sum())
+        return direct_cost < TABLE_CELL_COST * values.size
+
+    def sum(self, values, boxes):
+        if self.prefers_boxes(values, boxes):
+            return box_sums(values, boxes)
+
+        table = self.__table
+        partial = table[1:values.shape[0] + 1, 1:values.shape[1] + 1]
+        if self.__pool is not None:
+            self.__pool.cumsum2d(values, partial)
+        else:
+            if values.dtype == np.float64:
+                np.cumsum(values, axis=0, out=partial)
+            else:
+                np.copyto(partial, values)
+                np.cumsum(partial, axis=0, out=partial)
+            np.cumsum(partial, axis=1, out=partial)
+
+        x_min, x_max, y_min, y_max = boxes
+        return (
+            table[x_max, y_max] - table[x_min, y_max]
+            - table[x_max, y_min] + table[x_min, y_min]
+        )
+
+
+def coarse_shape(width, height, scale):
+    return -(-width // scale), -(-height // scale)
+
+
+def coarse_cell_areas(width, height, scale):
+    columns, rows = coarse_shape(width, height, scale)
+    cell_widths = np.minimum(width - np.arange(columns) * scale, scale)
+    cell_heights = np.minimum(height - np.arange(rows) * scale, scale)
+    return np.outer(cell_widths, cell_heights).astype(np.float64)
+
+
+class CoarseResourceSampler:
+    def __init__(self, width, height, scale):
+        self.__width = width
+        self.__height = height
+        self.__scale = scale
+        self.__columns, self.__rows = coarse_shape(width, height, scale)
+        self.__table = np.zeros((self.__columns + 2, self.__rows + 2))
+        self.__areas = coarse_cell_areas(width, height, scale)
+
+    def get_scale(self):
+        return self.__scale
+
+    def mean(self, values):
+        return float((values * self.__areas).sum()) / (self.__width * self.__height)
+
+    def __integral(self, xs, ys):
+        table = self.__table
+        scale = self.__scale
+        a, fx = np.divmod(xs, scale)
+        b, fy = np.divmod(ys, scale)
+        t00 = table[a, b]
+        t10 = table[a + 1, b]
+        t01 = table[a, b + 1]
+        t11 = table[a + 1, b + 1]
+        return (
+            scale * scale * t00 + scale * fx * (t10 - t00) + scale * fy * (t01 - t00)
+            + fx * fy * (t11 - t10 - t01 + t00)
+        )
+
+    def sample(self, values, boxes):
+        table = self.__table
+        partial = table[1:self.__columns + 1, 1:self.__rows + 1]
+        np.copyto(partial, values)
+        np.cumsum(partial, axis=0, out=partial)
+        np.cumsum(partial, axis=1, out=partial)
+        table[self.__columns + 1, :] = table[self.__columns, :]
+        table[:, self.__rows + 1] = table[:, self.__rows]
+
+        x_min, x_max, y_min, y_max = boxes
+        sums = (
+            self.__integral(x_max, y_max) - self.__integral(x_min, y_max)
+            - self.__integral(x_max, y_min) + self.__integral(x_min, y_min)
+        )
+        areas = np.maximum(x_max - x_min, 0) * np.maximum(y_max - y_min, 0)
+
+        means = np.zeros(len(sums))
+        np.divide(sums, areas, out=means, where=areas > 0)
+        return means
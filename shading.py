@@ -0,0 +1,134 @@
+import numpy as np
+
+
+LIGHT_MODES = ("dense", "sparse")
+
+
+class ShadingEngine:
+    def __init__(self, width, height, dtype=np.float64, pool=None):
+        self.__pool = pool
+        self.__width = width
+        self.__height = height
+        self.__canopy = np.zeros((width, height), dtype=dtype)
+        self.__tall = np.zeros((width, height), dtype=bool)
+        self.__low = np.zeros((width, height), dtype=bool)
+        self.__stencils = {}
+        self.__windows = []
+
+    def get_canopy(self):
+        return self.__canopy
+
+    def get_state(self):
+        return {
+            "windows": np.array(self.__windows, dtype=np.int64).reshape(-1, 4),
+            "canopy": np.concatenate([np.zeros(0, dtype=self.__canopy.dtype)] + [
+                self.__canopy[x_min:x_max, y_min:y_max].ravel() for x_min, x_max, y_min, y_max in self.__windows
+            ])
+        }
+
+    def load_state(self, state):
+        self.__canopy.fill(0)
+        self.__windows = [tuple(window) for window in state["windows"].tolist()]
+        start = 0
+        for x_min, x_max, y_min, y_max in self.__windows:
+            window = self.__canopy[x_min:x_max, y_min:y_max]
+            np.copyto(window, state["canopy"][start:start + window.size].reshape(window.shape))
+            start += window.size
+
+    def __stencil(self, radius):
+        key = int(radius)
+        stencil = self.__stencils.get(key)
+        if stencil is None:
+            offsets = np.arange(-key, key + 1)
+            stencil = np.sqrt(offsets[:, np.newaxis] ** 2 + offsets[np.newaxis, :] ** 2)
+            self.__stencils[key] = stencil
+        return stencil
+
+    def render(self, xs, ys, radii, heights):
+        if self.__pool is None:
+            self.__canopy.fill(0)
+            self.__windows = self.__stamp(xs, ys, radii, heights)
+            return
+
+        def render_band(start, stop):
+            self.__canopy[start:stop].fill(0)
+            rows = np.flatnonzero((xs + radii >= start) & (xs - radii < stop))
+            return self.__stamp(xs[rows], ys[rows], radii[rows], heights[rows], start, stop)
+
+        self.__windows = [
+            window for windows in self.__pool.for_bands(render_band, self.__width) for window in windows
+        ]
+
+    def render_sparse(self, xs, ys, radii, heights):
+        canopy = self.__canopy
+        for x_min, x_max, y_min, y_max in self.__windows:
+            canopy[x_min:x_max, y_min:y_max] = 0
+        self.__windows = self.__stamp(xs, ys, radii, heights)
+
+    def __stamp(self, xs, ys, radii, heights, band_start=0, band_stop=None):
+        if band_stop is None:
+            band_stop = self.__width
+        canopy = self.__canopy
+        windows = []
+
+        for x, y, r, h in zip(xs.tolist(), ys.tolist(), radii.tolist(), heights.tolist()):
+            k = int(r)
+            x_min = max(band_start, int(np.ceil(x - r)))
+            x_max = min(band_stop, int(np.floor(x + r)) + 1)
+            y_min = max(0, int(np.ceil(y - r)))
+            y_max = min(self.__height, int(np.floor(y + r)) + 1)
+
+            if x_min >= x_max or y_min >= y_max:
+                continue
+
+            if float(x).is_integer() and float(y).is_integer():
+                cx, cy = int(x) - k, int(y) - k
+                dist = self.__stencil(r)[x_min - cx:x_max - cx, y_min - cy:y_max - cy]
+            else:
+                dx = np.arange(x_min, x_max) - x
+                dy = np.arange(y_min, y_max) - y
+                dist = np.sqrt(dx[:, np.newaxis] ** 2 + dy[np.newaxis, :] ** 2)
+
+            window = canopy[x_min:x_max, y_min:y_max]
+            np.maximum(window, h, out=window, where=dist <= r)
+            windows.append((x_min, x_max, y_min, y_max))
+
+        return windows
+
+    def __shade_counts(self, region):
+        tall = np.count_nonzero(region > 10)
+        return tall, np.count_nonzero(region > 0) - tall
+
+    def get_shade_counts(self):
+        if not self.__windows:
+            return 0, 0
+        x_min, x_max, y_min, y_max = zip(*self.__windows)
+        return self.__shade_counts(self.__canopy[min(x_min):max(x_max), min(y_min):max(y_max)])
+
+    def sample_light(self, boxes, daylight):
+        canopy = self.__canopy
+        means = np.zeros(len(boxes[0]))
+        for k, (x_min, x_max, y_min, y_max) in enumerate(zip(*(bound.tolist() for bound in boxes))):
+            if x_min >= x_max or y_min >= y_max:
+                continue
+            area = (x_max - x_min) * (y_max - y_min)
+            tall, low = self.__shade_counts(canopy[x_min:x_max, y_min:y_max])
+            means[k] = daylight * (area - 0.3 * tall - 0.1 * low) / area
+        return means
+
+    def apply(self, light_map):
+        if self.__pool is not None:
+            self.__pool.for_bands(lambda start, stop: self.__apply(light_map, start, stop), self.__width)
+        else:
+            self.__apply(light_map, 0, self.__width)
+
+    def __apply(self, light_map, start, stop):
+        canopy = self.__canopy[start:stop]
+        tall = self.__tall[start:stop]
+        low = self.__low[start:stop]
+        light_map = light_map[start:stop]
+        np.greater(canopy, 10, out=tall)
+        np.greater(canopy, 0, out=low)
+        np.logical_xor(low, tall, out=low)
+        np.multiply(light_map, 0.7, out=light_map, where=tall)
+        np.multiply(light_map, 0.9, out=light_map, where=low)
@@ -0,0 +1,260 @@
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from checkpoint import load_checkpoint, save_checkpoint
+from consumption import CONSUMPTION_MODES
+from environment import Environment
+from metrics import MetricsRecorder
+from plants import PLANT_TYPES, SPECIES_TYPES
+from runlog import RunLog, RunRecorder
+from shading import LIGHT_MODES
+
+
+class Simulation:
+    def __init__(self, width, height, num_plants, consumption="sequential", seed=None,
+                 rain_probability=0.15, species_weights=None, lean=False, chunk_size=None, chunk_dir=None,
+                 light="dense", resource_scale=1, threads=None, bounded=True):
+        self.__environment = Environment(
+            width, height, num_plants, consumption=consumption, seed=seed,
+            rain_probability=rain_probability, species_weights=species_weights, lean=lean,
+            chunk_size=chunk_size, chunk_dir=chunk_dir, light=light, resource_scale=resource_scale,
+            threads=threads, bounded=bounded
+        )
+        self.__ticks_run = 0
+        self.__elapsed = 0.0
+        self.__metrics = None
+        self.__recorder = None
+
+    @classmethod
+    def from_environment(cls, environment):
+        simulation = cls.__new__(cls)
+        simulation.__environment = environment
+        simulation.__ticks_run = 0
+        simulation.__elapsed = 0.0
+        simulation.__metrics = None
+        simulation.__recorder = None
+        return simulation
+
+    @classmethod
+    def from_checkpoint(cls, path, chunk_dir=None, threads=None):
+        return cls.from_environment(load_checkpoint(path, chunk_dir=chunk_dir, threads=threads))
+
+    @classmethod
+    def from_run_log(cls, path, tick, run=None, chunk_dir=None, threads=None):
+        return cls.from_environment(RunLog(path).seek(tick, run=run, chunk_dir=chunk_dir, threads=threads))
+
+    def get_environment(self):
+        return self.__environment
+
+    def get_tick(self):
+        return self.__environment.get_tick()
+
+    def get_metrics(self):
+        return self.__metrics
+
+    def set_metrics(self, recorder):
+        self.__metrics = recorder
+        if recorder is not None:
+            recorder.record(self.__environment)
+
+    def get_recorder(self):
+        return self.__recorder
+
+    def set_recorder(self, recorder, start=True):
+        self.__recorder = recorder
+        if recorder is None:
+            return
+        if start:
+            recorder.start(self.__environment)
+        else:
+            recorder.attach(self.__environment)
+
+    def step(self):
+        self.__environment.update_resources()
+        self.__environment.remove_dead_plants()
+        self.__ticks_run += 1
+        if self.__recorder is not None:
+            self.__recorder.record(self.__environment)
+        if self.__metrics is not None:
+            self.__metrics.record(self.__environment)
+
+    def save_checkpoint(self, path):
+        save_checkpoint(self.__environment, path)
+
+    def run(self, ticks, checkpoint_path=None, checkpoint_every=0):
+        started = time.perf_counter()
+        for _ in range(ticks):
+            self.step()
+            if checkpoint_path and checkpoint_every and self.get_tick() % checkpoint_every == 0:
+                self.save_checkpoint(checkpoint_path)
+        elapsed = time.perf_counter() - started
+        self.__elapsed += elapsed
+        return elapsed
+
+    def get_summary(self):
+        population = self.__environment.get_population()
+        health = population.get_column("health")
+        species_count = np.bincount(population.get_column("species"), minlength=len(PLANT_TYPES))
+
+        return {
+            "ticks": self.get_tick(),
+            "seed": self.__environment.get_seed(),
+            "width": self.__environment.get_width(),
+            "height": self.__environment.get_height(),
+            "plants": len(population),
+            "dead_plants": self.__environment.get_dead_plants_count(),
+            "species": {
+                plant_type.SPECIES: int(species_count[PLANT_TYPES.index(plant_type)])
+                for plant_type in SPECIES_TYPES
+            },
+            "mean_health": float(health.mean()) if len(health) else 0.0,
+            "day_night_cycle": self.__environment.get_day_night_cycle(),
+            "raining": self.__environment.is_raining(),
+            "elapsed_seconds": self.__elapsed,
+            "ticks_per_second": self.__ticks_run / self.__elapsed if self.__elapsed > 0 else 0.0
+        }
+
+
+def parse_size(value):
+    try:
+        width, height = (int(part) for part in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Размер должен иметь вид ШИРИНАxВЫСОТА: {value}")
+    if width <= 0 or height <= 0:
+        raise argparse.ArgumentTypeError(f"Размер должен быть положительным: {value}")
+    return width, height
+
+
+def parse_resource_scale(value):
+    try:
+        if "=" not in value:
+            return int(value)
+        return {name.strip(): int(scale) for name, scale in (part.split("=") for part in value.split(","))}
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Масштаб задаётся числом или парами слой=число: {value}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="simulation", description="Моделирование растительных сообществ без GUI")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Запустить симуляцию и вывести итоговую статистику")
+    run_parser.add_argument("--ticks", type=int, default=1000)
+    run_parser.add_argument("--plants", type=int, default=20)
+    run_parser.add_argument("--size", type=parse_size, default=(700, 500))
+    run_parser.add_argument("--seed", type=int, default=None)
+    run_parser.add_argument("--consumption", choices=CONSUMPTION_MODES, default="sequential")
+    run_parser.add_argument("--lean", action="store_true", help="Карты float32 без временных массивов")
+    run_parser.add_argument("--light", choices=LIGHT_MODES, default="dense",
+                            help="sparse: считать свет только под кронами растений")
+    run_parser.add_argument("--resource-scale", type=parse_resource_scale, default=1,
+                            help="Огрубление карт воды и питательных веществ: 4 или water=4,nutrients=8")
+    run_parser.add_argument("--threads", type=int, default=None,
+                            help="Считать сеточные ядра полосами в пуле из N потоков")
+    run_parser.add_argument("--chunk-size", type=int, default=None,
+                            help="Разбить карты на чанки NxN и обновлять только чанки с растениями")
+    run_parser.add_argument("--chunk-dir", default=None, help="Каталог для карт чанков в файлах np.memmap")
+    run_parser.add_argument("--unbounded", dest="bounded", action="store_false",
+                            help="Не удерживать растения в границах мира (по умолчанию удерживаются, как в GUI)")
+    run_parser.add_argument("--output", default=None, help="Файл для JSON-сводки (по умолчанию stdout)")
+    run_parser.add_argument("--checkpoint", default=None, help="Файл контрольной точки (.npz)")
+    run_parser.add_argument("--checkpoint-every", type=int, default=0,
+                            help="Сохранять контрольную точку каждые N тиков")
+    run_parser.add_argument("--resume", default=None, help="Продолжить с контрольной точки")
+    run_parser.add_argument("--metrics", default=None,
+                            help="Каталог для поколоночной записи метрик по тикам (с --resume история дописывается)")
+    run_parser.add_argument("--metrics-capacity", type=int, default=4096)
+    run_parser.add_argument("--record", default=None,
+                            help="Каталог журнала событий с ключевыми кадрами для перемотки")
+    run_parser.add_argument("--keyframe-every", type=int, default=500,
+                            help="Сохранять ключевой кадр журнала каждые N тиков")
+
+    replay_parser = commands.add_parser("replay", help="Восстановить состояние прогона из журнала на заданном тике")
+    replay_parser.add_argument("log", help="Каталог журнала событий")
+    replay_parser.add_argument("--tick", type=int, default=None, help="Тик (по умолчанию последний записанный)")
+    replay_parser.add_argument("--run", type=int, default=None, help="Номер прогона (по умолчанию последний)")
+    replay_parser.add_argument("--threads", type=int, default=None)
+    replay_parser.add_argument("--chunk-dir", default=None)
+    replay_parser.add_argument("--events", action="store_true", help="Добавить события прогона до тика")
+    replay_parser.add_argument("--extrapolate", action="store_true",
+                               help="Разрешить тик за концом журнала: досчитать незаписанные тики")
+    replay_parser.add_argument("--output", default=None, help="Файл для JSON-сводки (по умолчанию stdout)")
+    return parser
+
+
+def write_summary(summary, output):
+    text = json.dumps(summary, ensure_ascii=False, indent=2)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+def run_command(args):
+    if args.resume:
+        simulation = Simulation.from_checkpoint(args.resume, chunk_dir=args.chunk_dir, threads=args.threads)
+    else:
+        width, height = args.size
+        simulation = Simulation(
+            width, height, args.plants, consumption=args.consumption, seed=args.seed, lean=args.lean,
+            chunk_size=args.chunk_size, chunk_dir=args.chunk_dir, light=args.light,
+            resource_scale=args.resource_scale, threads=args.threads, bounded=args.bounded
+        )
+    if args.metrics:
+        simulation.set_metrics(
+            MetricsRecorder(capacity=args.metrics_capacity, path=args.metrics, append=args.resume is not None)
+        )
+    if args.record:
+        simulation.set_recorder(RunRecorder(args.record, keyframe_every=args.keyframe_every))
+
+    simulation.run(args.ticks, checkpoint_path=args.checkpoint, checkpoint_every=args.checkpoint_every)
+    if args.metrics:
+        simulation.get_metrics().close()
+    if args.record:
+        simulation.get_recorder().close()
+    if args.checkpoint:
+        simulation.save_checkpoint(args.checkpoint)
+    simulation.get_environment().close()
+    write_summary(simulation.get_summary(), args.output)
+
+
+def replay_command(args):
+    log = RunLog(args.log)
+    run = args.run if args.run is not None else max(log.get_runs(), default=None)
+    tick = args.tick if args.tick is not None else log.get_last_tick(run)
+
+    started = time.perf_counter()
+    environment = log.seek(tick, run=run, chunk_dir=args.chunk_dir, threads=args.threads, extrapolate=args.extrapolate)
+    elapsed = time.perf_counter() - started
+    summary = Simulation.from_environment(environment).get_summary()
+    environment.close()
+
+    summary.update(
+        run=run, keyframe_tick=log.get_keyframe_tick(tick, run), seek_seconds=elapsed,
+        elapsed_seconds=0.0, ticks_per_second=0.0
+    )
+    if args.events:
+        summary["events"] = log.get_events(run, stop=tick + 1)
+    write_summary(summary, args.output)
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        run_command(args)
+    elif args.command == "replay":
+        try:
+            replay_command(args)
+        except ValueError as error:
+            parser.error(str(error))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+import numpy as np
+
+
+class SpatialGrid:
+    def __init__(self, width, height, cell_size=64):
+        self.__cell_size = cell_size
+        self.__columns = max(1, int(np.ceil(width / cell_size)))
+        self.__rows = max(1, int(np.ceil(height / cell_size)))
+        self.__population = None
+        self.__revision = None
+        self.__order = np.empty(0, dtype=np.int64)
+        self.__cell_start = np.zeros(self.__columns * self.__rows + 1, dtype=np.int64)
+        self.__max_radius = 0.0
+
+    def get_cell_size(self):
+        return self.__cell_size
+
+    def refresh(self, population):
+        if population is self.__population and population.get_revision() == self.__revision:
+            return
+
+        cells = self.__cell_of(population.get_column("x"), population.get_column("y"))
+        self.__order = np.argsort(cells, kind="stable")
+        counts = np.bincount(cells, minlength=self.__columns * self.__rows)
+        self.__cell_start[1:] = np.cumsum(counts)
+
+        radii = population.get_column("radius")
+        self.__max_radius = float(radii.max()) if len(radii) else 0.0
+        self.__population = population
+        self.__revision = population.get_revision()
+
+    def __cell_coords(self, xs, ys):
+        cx = np.clip(np.floor_divide(xs, self.__cell_size).astype(np.int64), 0, self.__columns - 1)
+        cy = np.clip(np.floor_divide(ys, self.__cell_size).astype(np.int64), 0, self.__rows - 1)
+        return cx, cy
+
+    def __cell_of(self, xs, ys):
+        cx, cy = self.__cell_coords(xs, ys)
+        return cx * self.__rows + cy
+
+    def __candidates(self, x_min, y_min, x_max, y_max):
+        (cx_min, cx_max), (cy_min, cy_max) = self.__cell_coords(np.array([x_min, x_max]), np.array([y_min, y_max]))
+        columns = np.arange(cx_min, cx_max + 1) * self.__rows
+        starts = self.__cell_start[columns + cy_min]
+        stops = self.__cell_start[columns + cy_max + 1]
+        rows = [self.__order[start:stop] for start, stop in zip(starts.tolist(), stops.tolist()) if start < stop]
+        if not rows:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate(rows))
+
+    def rows_in_box(self, x_min, y_min, x_max, y_max):
+        margin = self.__max_radius
+        rows = self.__candidates(x_min - margin, y_min - margin, x_max + margin, y_max + margin)
+
+        xs = self.__population.get_column("x")[rows]
+        ys = self.__population.get_column("y")[rows]
+        radii = self.__population.get_column("radius")[rows]
+        dx = np.maximum(np.maximum(x_min - xs, xs - x_max), 0)
+        dy = np.maximum(np.maximum(y_min - ys, ys - y_max), 0)
+        return rows[dx ** 2 + dy ** 2 <= radii ** 2]
+
+    def rows_at(self, x, y):
+        return self.rows_in_box(x, y, x, y)
+
+    def overlapping_rows(self, row):
+        population = self.__population
+        x = population.get_column("x")[row]
+        y = population.get_column("y")[row]
+        r = population.get_column("radius")[row]
+
+        margin = r + self.__max_radius
+        rows = self.__candidates(x - margin, y - margin, x + margin, y + margin)
+        rows = rows[rows != row]
+
+        dx = population.get_column("x")[rows] - x
+        dy = population.get_column("y")[rows] - y
+        reach = population.get_column("radius")[rows] + r
+        return rows[dx ** 2 + dy ** 2 < reach ** 2]
+
+    def __plants(self, rows):
+        plants = self.__population.get_plants()
+        return [plants[row] for row in rows.tolist()]
+
+    def plants_at(self, x, y):
+        return self.__plants(self.rows_at(x, y))
+
+    def plants_in_box(self, x_min, y_min, x_max, y_max):
+        return self.__plants(self.rows_in_box(x_min, y_min, x_max, y_max))
+
+    def overlapping(self, plant):
+        return self.__plants(self.overlapping_rows(self.__population.index_of(plant.get_id())))
@@ -0,0 +1,209 @@
+import numpy as np
+
+
+def chunk_spans(boxes, chunk_size):
+    x_min, x_max, y_min, y_max = boxes
+    rows = np.flatnonzero((x_min < x_max) & (y_min < y_max))
+    x_min, x_max, y_min, y_max = x_min[rows], x_max[rows], y_min[rows], y_max[rows]
+
+    first_x = x_min // chunk_size
+    first_y = y_min // chunk_size
+    count_y = (y_max - 1) // chunk_size - first_y + 1
+    counts = ((x_max - 1) // chunk_size - first_x + 1) * count_y
+
+    owners = np.repeat(np.arange(len(rows)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    chunk_x = first_x[owners] + offsets // count_y[owners]
+    chunk_y = first_y[owners] + offsets % count_y[owners]
+
+    origin_x = chunk_x * chunk_size
+    origin_y = chunk_y * chunk_size
+    local = (
+        np.maximum(x_min[owners], origin_x) - origin_x,
+        np.minimum(x_max[owners], origin_x + chunk_size) - origin_x,
+        np.maximum(y_min[owners], origin_y) - origin_y,
+        np.minimum(y_max[owners], origin_y + chunk_size) - origin_y
+    )
+    return rows[owners], chunk_x, chunk_y, local
+
+
+def group_by_chunk(chunk_x, chunk_y, columns):
+    keys = chunk_x * columns + chunk_y
+    order = np.argsort(keys, kind="stable")
+    unique, starts = np.unique(keys[order], return_index=True)
+    stops = np.append(starts[1:], len(order))
+    return order, (unique // columns).tolist(), (unique % columns).tolist(), starts.tolist(), stops.tolist()
+
+
+class ChunkStack:
+    def __init__(self, chunks, chunk_size, dtype):
+        self.__chunks = chunks
+        self.__chunk_size = chunk_size
+        self.__dtype = dtype
+
+    def __len__(self):
+        return len(self.__chunks)
+
+    def __iter__(self):
+        return iter(self.__chunks)
+
+    def get_shape(self):
+        return len(self.__chunks), self.__chunk_size, self.__chunk_size
+
+    def get_dtype(self):
+        return self.__dtype
+
+
+class ChunkedGrid:
+    def __init__(self, width, height, chunk_size, fill=0.0, dtype=np.float64, path=None):
+        if chunk_size <= 0:
+            raise ValueError(f"Размер чанка должен быть положительным: {chunk_size}")
+
+        self.__width = width
+        self.__height = height
+        self.__chunk_size = chunk_size
+        self.__shape = (-(-width // chunk_size), -(-height // chunk_size))
+        self.__fill = float(fill)
+        self.__dtype = np.dtype(dtype)
+        self.__path = path
+        self.__storage = None
+        if path is not None:
+            self.__storage = np.memmap(path, dtype=self.__dtype, mode="w+", shape=self.__shape + (chunk_size, chunk_size))
+        self.__chunks = {}
+        self.__offset = np.zeros(self.__shape)
+        self.__low = np.full(self.__shape, -np.inf)
+        self.__high = np.full(self.__shape, np.inf)
+        self.__stale = np.zeros(self.__shape, dtype=bool)
+
+        self.__cells_x = np.minimum(width - np.arange(self.__shape[0]) * chunk_size, chunk_size)
+        self.__cells_y = np.minimum(height - np.arange(self.__shape[1]) * chunk_size, chunk_size)
+
+    def get_chunk_size(self):
+        return self.__chunk_size
+
+    def get_shape(self):
+        return self.__shape
+
+    def get_dtype(self):
+        return self.__dtype
+
+    def get_path(self):
+        return self.__path
+
+    def get_allocated_count(self):
+        return len(self.__chunks)
+
+    def is_allocated(self, i, j):
+        return (i, j) in self.__chunks
+
+    def add_clip(self, amount, low, high):
+        self.__offset += amount
+        np.add(self.__low, amount, out=self.__low)
+        np.clip(self.__low, low, high, out=self.__low)
+        np.add(self.__high, amount, out=self.__high)
+        np.clip(self.__high, low, high, out=self.__high)
+        self.__stale.fill(True)
+
+    def set_all(self, value):
+        self.add_clip(0.0, value, value)
+
+    def chunk(self, i, j):
+        values = self.__chunks.get((i, j))
+        if values is None:
+            values = self.__allocate(i, j)
+            values.fill(self.__uniform_value(i, j))
+        elif self.__stale.item(i, j):
+            values += self.__offset.item(i, j)
+            np.clip(values, self.__low.item(i, j), self.__high.item(i, j), out=values)
+        else:
+            return values
+
+        self.__offset[i, j] = 0.0
+        self.__low[i, j] = -np.inf
+        self.__high[i, j] = np.inf
+        self.__stale[i, j] = False
+        return values
+
+    def __allocate(self, i, j):
+        if self.__storage is not None:
+            values = self.__storage[i, j]
+        else:
+            values = np.empty((self.__chunk_size, self.__chunk_size), dtype=self.__dtype)
+        self.__chunks[(i, j)] = values
+        return values
+
+    def view(self, i, j):
+        values = self.__chunks.get((i, j))
+        if values is None:
+            return np.full((self.__chunk_size, self.__chunk_size), self.__uniform_value(i, j), dtype=self.__dtype)
+        if not self.__stale.item(i, j):
+            return values
+
+        pending = values + self.__offset.item(i, j)
+        np.clip(pending, self.__low.item(i, j), self.__high.item(i, j), out=pending)
+        return pending
+
+    def __uniform_value(self, i, j):
+        return min(max(self.__fill + self.__offset.item(i, j), self.__low.item(i, j)), self.__high.item(i, j))
+
+    def __uniform_values(self):
+        return np.minimum(np.maximum(self.__fill + self.__offset, self.__low), self.__high)
+
+    def sum(self):
+        total = 0.0
+        for i, j in sorted(self.__chunks):
+            values = self.view(i, j)[:self.__cells_x[i], :self.__cells_y[j]]
+            total += float(values.sum(dtype=np.float64))
+
+        cells = np.outer(self.__cells_x, self.__cells_y).astype(np.float64)
+        for i, j in self.__chunks:
+            cells[i, j] = 0.0
+        return total + float((self.__uniform_values() * cells).sum())
+
+    def mean(self):
+        return self.sum() / (self.__width * self.__height)
+
+    def to_dense(self):
+        dense = np.empty((self.__width, self.__height), dtype=self.__dtype)
+        uniform = self.__uniform_values()
+        size = self.__chunk_size
+        for i in range(self.__shape[0]):
+            for j in range(self.__shape[1]):
+                window = dense[i * size:(i + 1) * size, j * size:(j + 1) * size]
+                if (i, j) in self.__chunks:
+                    np.copyto(window, self.view(i, j)[:window.shape[0], :window.shape[1]])
+                else:
+                    window.fill(uniform[i, j])
+        return dense
+
+    def flush(self):
+        if self.__storage is not None:
+            self.__storage.flush()
+
+    def get_state(self):
+        index = sorted(self.__chunks)
+        return {
+            "index": np.array(index, dtype=np.int64).reshape(-1, 2),
+            "chunks": ChunkStack([self.__chunks[key] for key in index], self.__chunk_size, self.__dtype),
+            "offset": self.__offset,
+            "low": self.__low,
+            "high": self.__high,
+            "stale": self.__stale
+        }
+
+    def load_state(self, state):
+        self.__chunks.clear()
+        if "offset" in state:
+            for (i, j), values in zip(state["index"].tolist(), state["chunks"]):
+                np.copyto(self.__allocate(i, j), values)
+            for target, name in ((self.__offset, "offset"), (self.__low, "low"), (self.__high, "high"),
+                                 (self.__stale, "stale")):
+                np.copyto(target, state[name])
+            return
+
+        self.__offset.fill(0.0)
+        np.copyto(self.__low, state["values"])
+        np.copyto(self.__high, state["values"])
+        self.__stale.fill(True)
+        for (i, j), values in zip(state["index"].tolist(), state["chunks"]):
+            np.copyto(self.chunk(i, j), values)
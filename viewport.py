@@ -0,0 +1,81 @@
+import numpy as np
+
+
+MAX_ZOOM = 16.0
+
+
+class Viewport:
+    def __init__(self, world_width, world_height, width=None, height=None):
+        self.__world_width = world_width
+        self.__world_height = world_height
+        self.__width = width if width is not None else world_width
+        self.__height = height if height is not None else world_height
+        self.__revision = 0
+        self.reset()
+
+    def get_zoom(self):
+        return self.__zoom
+
+    def get_min_zoom(self):
+        return min(self.__width / self.__world_width, self.__height / self.__world_height, 1.0)
+
+    def get_origin(self):
+        return self.__x, self.__y
+
+    def get_size(self):
+        return self.__width, self.__height
+
+    def get_revision(self):
+        return self.__revision
+
+    def reset(self):
+        self.__zoom = self.get_min_zoom()
+        self.__x = 0.0
+        self.__y = 0.0
+        self.__revision += 1
+
+    def set_size(self, width, height):
+        if width <= 1 or height <= 1 or (width, height) == (self.__width, self.__height):
+            return
+        self.__width = width
+        self.__height = height
+        self.__zoom = max(self.__zoom, self.get_min_zoom())
+        self.__clamp()
+
+    def zoom_at(self, factor, px, py):
+        x, y = self.to_world(px, py)
+        self.__zoom = min(max(self.__zoom * factor, self.get_min_zoom()), MAX_ZOOM)
+        self.__x = x - px / self.__zoom
+        self.__y = y - py / self.__zoom
+        self.__clamp()
+
+    def pan(self, dx, dy):
+        self.__x -= dx / self.__zoom
+        self.__y -= dy / self.__zoom
+        self.__clamp()
+
+    def __clamp(self):
+        self.__x = min(max(self.__x, 0.0), max(self.__world_width - self.__width / self.__zoom, 0.0))
+        self.__y = min(max(self.__y, 0.0), max(self.__world_height - self.__height / self.__zoom, 0.0))
+        self.__revision += 1
+
+    def to_world(self, px, py):
+        return self.__x + px / self.__zoom, self.__y + py / self.__zoom
+
+    def to_canvas(self, xs, ys):
+        return (xs - self.__x) * self.__zoom, (ys - self.__y) * self.__zoom
+
+    def get_visible_box(self):
+        return (
+            self.__x, self.__y,
+            min(self.__x + self.__width / self.__zoom, self.__world_width),
+            min(self.__y + self.__height / self.__zoom, self.__world_height)
+        )
+
+    def get_pixel_cells(self):
+        x_min, y_min, x_max, y_max = self.get_visible_box()
+        columns = np.arange(max(int((x_max - x_min) * self.__zoom), 1))
+        rows = np.arange(max(int((y_max - y_min) * self.__zoom), 1))
+        xs = np.minimum((x_min + (columns + 0.5) / self.__zoom).astype(np.intp), self.__world_width - 1)
+        ys = np.minimum((y_min + (rows + 0.5) / self.__zoom).astype(np.intp), self.__world_height - 1)
+        return xs, ys
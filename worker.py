@@ -0,0 +1,268 @@
+import queue
+import threading
+import time
+
+from metrics import MetricsRecorder
+from plants import PlantPopulation
+from runlog import RunRecorder
+from simulation import Simulation
+from spatial import SpatialGrid
+
+
+FRAME_BUDGET_SECONDS = 0.1
+RECORDED_ACTIONS = ("resume", "pause", "speed", "ticks_per_frame", "restart")
+
+
+class Frame:
+    def __init__(self, environment, metrics, epoch, layer=None):
+        population = environment.get_population()
+        self.__columns = {}
+        for name, column in population.get_columns().items():
+            column = column.copy()
+            column.setflags(write=False)
+            self.__columns[name] = column
+
+        self.__epoch = epoch
+        self.__generation = population.get_generation()
+        self.__revision = population.get_revision()
+        self.__width = environment.get_width()
+        self.__height = environment.get_height()
+        self.__tick = environment.get_tick()
+        self.__day_night_cycle = environment.get_day_night_cycle()
+        self.__raining = environment.is_raining()
+        self.__dead_plants_count = environment.get_dead_plants_count()
+        self.__metrics = metrics.latest()
+        self.__layer = None
+        if layer is not None:
+            values, scale = environment.get_layer(layer)
+            values = values.copy()
+            values.setflags(write=False)
+            self.__layer = (layer, values, scale)
+        self.__snapshot = None
+        self.__spatial = None
+
+    def __len__(self):
+        return len(self.__columns["id"])
+
+    def get_epoch(self):
+        return self.__epoch
+
+    def get_column(self, name):
+        return self.__columns[name]
+
+    def get_generation(self):
+        return self.__generation
+
+    def get_revision(self):
+        return self.__revision
+
+    def get_population(self):
+        return self
+
+    def get_plants(self):
+        if self.__snapshot is None:
+            self.__snapshot = PlantPopulation(max(len(self), 1))
+            self.__snapshot.load_columns(self.__columns)
+        return self.__snapshot.get_plants()
+
+    def get_spatial_index(self):
+        if self.__spatial is None:
+            self.__spatial = SpatialGrid(self.__width, self.__height)
+            self.__spatial.refresh(self)
+        return self.__spatial
+
+    def get_width(self):
+        return self.__width
+
+    def get_height(self):
+        return self.__height
+
+    def get_tick(self):
+        return self.__tick
+
+    def get_day_night_cycle(self):
+        return self.__day_night_cycle
+
+    def is_raining(self):
+        return self.__raining
+
+    def get_dead_plants_count(self):
+        return self.__dead_plants_count
+
+    def get_metrics(self):
+        return self.__metrics
+
+    def get_layer(self, name):
+        if self.__layer is None or self.__layer[0] != name:
+            return None
+        return self.__layer[1:]
+
+
+class SimulationWorker:
+    def __init__(self, width, height, num_plants, seed=None, speed=1.0, frame_queue_size=2, record=None,
+                 keyframe_every=500):
+        self.__width = width
+        self.__height = height
+        self.__commands = queue.Queue()
+        self.__frames = queue.Queue(maxsize=frame_queue_size)
+        self.__dropped_frames = 0
+        self.__epoch = 0
+        self.__speed = speed
+        self.__running = True
+        self.__ticks_per_frame = 1
+        self.__timer = None
+        self.__layer = None
+        self.__recorder = RunRecorder(record, keyframe_every=keyframe_every) if record is not None else None
+        self.__create(num_plants, seed)
+        self.__latest = Frame(self.__simulation.get_environment(), self.__metrics, self.__epoch)
+        self.__thread = threading.Thread(target=self.__run, name="simulation-worker", daemon=True)
+
+    def start(self):
+        self.__thread.start()
+
+    def get_dropped_frames(self):
+        return self.__dropped_frames
+
+    def resume(self):
+        self.__commands.put(("resume",))
+
+    def pause(self):
+        self.__commands.put(("pause",))
+
+    def restart(self, num_plants, seed=None):
+        self.__commands.put(("restart", num_plants, seed))
+
+    def set_speed(self, speed):
+        self.__commands.put(("speed", speed))
+
+    def set_ticks_per_frame(self, ticks):
+        self.__commands.put(("ticks_per_frame", ticks))
+
+    def seek(self, tick):
+        self.__commands.put(("seek", tick))
+
+    def get_recorded_tick(self):
+        return self.__recorder.get_last_tick() if self.__recorder is not None else None
+
+    def set_overlay(self, layer):
+        self.__commands.put(("layer", layer))
+
+    def set_phase_timer(self, timer):
+        self.__commands.put(("timer", timer))
+
+    def stop(self):
+        self.__commands.put(("stop",))
+        if self.__thread.is_alive():
+            self.__thread.join(timeout=1.0)
+
+    def poll_frame(self):
+        frame = None
+        while True:
+            try:
+                frame = self.__frames.get_nowait()
+            except queue.Empty:
+                break
+        if frame is not None:
+            self.__latest = frame
+        return frame
+
+    def get_latest_frame(self):
+        return self.__latest
+
+    def __create(self, num_plants, seed):
+        self.__attach(Simulation(self.__width, self.__height, num_plants, seed=seed))
+        if self.__recorder is not None:
+            self.__simulation.set_recorder(self.__recorder)
+
+    def __attach(self, simulation):
+        self.__simulation = simulation
+        self.__simulation.get_environment().set_phase_timer(self.__timer)
+        self.__metrics = MetricsRecorder()
+        self.__simulation.set_metrics(self.__metrics)
+
+    def __publish(self):
+        frame = Frame(self.__simulation.get_environment(), self.__metrics, self.__epoch, self.__layer)
+        while True:
+            try:
+                self.__frames.put_nowait(frame)
+                return
+            except queue.Full:
+                try:
+                    self.__frames.get_nowait()
+                    self.__dropped_frames += 1
+                except queue.Empty:
+                    pass
+
+    def __handle(self, command):
+        name = command[0]
+        if self.__recorder is not None and name in RECORDED_ACTIONS:
+            self.__recorder.action(name, command[1] if len(command) > 1 else None)
+
+        if name == "resume":
+            self.__running = True
+        elif name == "pause":
+            self.__running = False
+        elif name == "speed":
+            self.__speed = command[1]
+        elif name == "ticks_per_frame":
+            self.__ticks_per_frame = command[1]
+        elif name == "timer":
+            self.__timer = command[1]
+            self.__simulation.get_environment().set_phase_timer(self.__timer)
+        elif name == "layer":
+            self.__layer = command[1]
+            self.__publish()
+        elif name == "restart":
+            self.__epoch += 1
+            self.__create(command[1], command[2])
+            self.__publish()
+        elif name == "seek":
+            self.__seek(command[1])
+        elif name == "stop" and self.__recorder is not None:
+            self.__recorder.close()
+        return name != "stop"
+
+    def __seek(self, tick):
+        if self.__recorder is None:
+            return
+        tick = min(tick, self.__recorder.get_last_tick())
+        self.__recorder.flush()
+        self.__simulation.get_environment().close()
+        self.__attach(Simulation.from_run_log(self.__recorder.get_path(), tick, run=self.__recorder.get_run()))
+        self.__simulation.set_recorder(self.__recorder, start=False)
+        self.__recorder.action("seek", tick)
+        self.__running = False
+        self.__epoch += 1
+        self.__publish()
+
+    def __run(self):
+        next_tick = time.perf_counter()
+        while True:
+            timeout = max(0.0, next_tick - time.perf_counter()) if self.__running else None
+            try:
+                command = self.__commands.get(timeout=timeout)
+            except queue.Empty:
+                command = None
+
+            if command is not None:
+                if not self.__handle(command):
+                    return
+                continue
+
+            self.__run_batch()
+            self.__publish()
+            period = 0.0 if self.__ticks_per_frame is None else 0.3 / self.__speed
+            next_tick = max(next_tick + period, time.perf_counter())
+
+    def __run_batch(self):
+        if self.__ticks_per_frame is not None:
+            for _ in range(self.__ticks_per_frame):
+                self.__simulation.step()
+                if not self.__commands.empty():
+                    return
+            return
+
+        deadline = time.perf_counter() + FRAME_BUDGET_SECONDS
+        self.__simulation.step()
+        while time.perf_counter() < deadline and self.__commands.empty():
+            self.__simulation.step()